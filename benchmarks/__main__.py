@@ -0,0 +1,102 @@
+"""
+Offline throughput benchmark of DataDownloading against a local archive stand-in.
+
+    python -m benchmarks --days 10 --latency 0.1 --bandwidth 5e6 --error-rate 0.02
+"""
+
+from benchmarks.archive import Archive
+from benchmarks.cases import CASES, run_case
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os.path as osp
+import tempfile
+import time
+
+COLUMNS: List[str] = [
+    "case",
+    "files",
+    "mb",
+    "seconds",
+    "files_per_s",
+    "mb_per_s",
+    "retries",
+    "failures",
+    "peak_rss_mb",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--start", default="2020-01-01", help="First date, YYYY-MM-DD")
+    parser.add_argument("--days", type=int, default=5, help="Days (months for Dst)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds")
+    parser.add_argument("--bandwidth", type=float, default=None, help="Bytes/s")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--listing-size", type=int, default=80)
+    parser.add_argument("--scheduler", default="pipeline")
+    parser.add_argument("--output", default=None, help="JSON lines file to append to")
+    return parser.parse_args()
+
+
+def report(rows: List[Dict[str, Any]]) -> None:
+    print(" ".join(f"{column:>12}" for column in COLUMNS))
+    for row in rows:
+        print(
+            " ".join(
+                (
+                    f"{row[column]:>12.2f}"
+                    if isinstance(row[column], float)
+                    else f"{row[column]:>12}"
+                )
+                for column in COLUMNS
+            )
+        )
+
+
+async def main(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    archive = Archive(args.latency, args.bandwidth, args.error_rate, args.listing_size)
+    base: str = await archive.start()
+    loop = asyncio.get_running_loop()
+    start = datetime.strptime(args.start, "%Y-%m-%d")
+    rows: List[Dict[str, Any]] = []
+    try:
+        for name in args.cases:
+            with tempfile.TemporaryDirectory() as root, ProcessPoolExecutor(
+                1, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                rows.append(
+                    await loop.run_in_executor(
+                        pool,
+                        run_case,
+                        name,
+                        base,
+                        osp.join(root, name),
+                        start,
+                        args.days,
+                        args.scheduler,
+                    )
+                )
+    finally:
+        await archive.stop()
+    return rows
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    rows = asyncio.run(main(args))
+    report(rows)
+    if args.output is not None:
+        config: Dict[str, Any] = {
+            key: value for key, value in vars(args).items() if key != "output"
+        }
+        with open(args.output, "a") as file:
+            for row in rows:
+                file.write(
+                    json.dumps({"time": time.time(), "config": config, **row}) + "\n"
+                )
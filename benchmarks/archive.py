@@ -0,0 +1,211 @@
+from aiohttp import web
+from astropy.io import fits
+from datetime import datetime, timedelta
+from spacepy import pycdf
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import asyncio
+import calendar
+import gzip
+import io
+import os
+import os.path as osp
+import random
+import re
+import tempfile
+
+DATE = re.compile(r"/(\d{4})/(\d{2})/(\d{2})/")
+MONTH = re.compile(r"/(\d{4})(\d{2})/dst\d{4}\.for\.request$")
+CHUNK_SIZE: int = 1 << 16
+
+
+def cdf_bytes(rows: int = 5400) -> bytes:
+    """
+    One day of an ACE MFI H0 file: Epoch plus the MAG variables.
+    """
+    with tempfile.TemporaryDirectory() as root:
+        path: str = osp.join(root, "ac_h0_mfi.cdf")
+        with pycdf.CDF(path, "") as cdf_file:
+            cdf_file["Epoch"] = [
+                datetime(2020, 1, 1) + timedelta(seconds=16 * i) for i in range(rows)
+            ]
+            for var in ["Magnitude", "dBrms"]:
+                cdf_file[var] = np.random.rand(rows).astype(np.float32)
+            for var in ["BGSM", "SC_pos_GSM", "BGSEc", "SC_pos_GSE"]:
+                cdf_file[var] = np.random.rand(rows, 3).astype(np.float32)
+        with open(path, "rb") as file:
+            return file.read()
+
+
+def lyra_bytes(rows: int = 1440) -> bytes:
+    """
+    One day of PROBA2/LYRA level 3: a binary table of minute, four channels and a flag.
+    """
+    columns = [fits.Column(name="TIME", format="D", array=np.arange(rows, dtype=float))]
+    columns += [
+        fits.Column(name=name, format="D", array=np.random.rand(rows))
+        for name in ["CHANNEL1", "CHANNEL2", "CHANNEL3", "CHANNEL4", "WARNING"]
+    ]
+    buffer = io.BytesIO()
+    fits.HDUList([fits.PrimaryHDU(), fits.BinTableHDU.from_columns(columns)]).writeto(
+        buffer
+    )
+    return buffer.getvalue()
+
+
+def suvi_bytes(size: int = 512) -> bytes:
+    """
+    A gzipped GOES-16 SUVI level 1b image.
+    """
+    buffer = io.BytesIO()
+    data = np.random.randint(0, 4096, (size, size)).astype(np.int16)
+    fits.PrimaryHDU(data).writeto(buffer)
+    return gzip.compress(buffer.getvalue(), compresslevel=1)
+
+
+def jp2_bytes(size: int = 1 << 20) -> bytes:
+    """
+    JPEG 2000 signature followed by an incompressible body, JSOC serves ~1 MB per AIA image.
+    """
+    return b"\x00\x00\x00\x0cjP  \r\n\x87\n" + os.urandom(size - 12)
+
+
+def dst_text(year: int, month: int) -> bytes:
+    """
+    Kyoto WDC format: one line per day with 24 hourly values and the daily mean.
+    """
+    lines: List[str] = []
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        values = [random.randint(-120, 30) for _ in range(24)]
+        lines.append(
+            f"DST{year % 100:02d}{month:02d}*{day:02d}  X220   000"
+            + "".join(f"{value:4d}" for value in values)
+            + f"{sum(values) // 24:4d}"
+        )
+    return ("\n".join(lines) + "\n\n\n").encode()
+
+
+def aia_names(date: datetime, n: int) -> List[str]:
+    names: List[str] = []
+    for i in range(n):
+        time = date + timedelta(seconds=36 * i)
+        names.append(time.strftime("%Y_%m_%d__%H_%M_%S_") + "35__SDO_AIA_AIA_171.jp2")
+    return names
+
+
+def suvi_names(date: datetime, n: int) -> List[str]:
+    names: List[str] = []
+    for i in range(n):
+        start = date + timedelta(minutes=4 * i)
+        stamp: str = start.strftime("%Y%j%H%M%S")
+        names.append(f"OR_SUVI-L1b-Fe171_G16_s{stamp}0_e{stamp}1_c{stamp}2.fits.gz")
+    return names
+
+
+def listing(names: List[str]) -> str:
+    links: str = "\n".join(f'<a href="{name}">{name}</a>' for name in names)
+    return f"<html><body><pre>\n{links}\n</pre></body></html>"
+
+
+class Archive:
+    """
+    Local stand-in for CDAWeb, JSOC, NGDC, the PROBA2 archive and Kyoto WDC.
+    Requests keep the real path under /<host>/ and are answered with
+    synthetic products generated once at startup.
+
+    Args:
+    latency (float): Seconds before each response starts.
+    bandwidth (Optional[float]): Bytes per second each response is streamed at, None for unlimited.
+    error_rate (float): Probability of answering 503 with Retry-After: 1.
+    listing_size (int): Entries in each daily directory listing.
+    seed (int): Seed of the error draws and the synthetic values.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        bandwidth: Optional[float] = None,
+        error_rate: float = 0.0,
+        listing_size: int = 80,
+        seed: int = 0,
+    ) -> None:
+        assert 0 <= error_rate < 1, "Not valid error_rate, must be in [0, 1)"
+        assert latency >= 0, "Not valid latency, must be >= 0"
+        assert bandwidth is None or bandwidth > 0, "Not valid bandwidth, must be > 0"
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.listing_size = listing_size
+        self.random = random.Random(seed)
+        np.random.seed(seed)
+        random.seed(seed)
+        self.products: Dict[str, bytes] = {
+            ".cdf": cdf_bytes(),
+            ".fits": lyra_bytes(),
+            ".fits.gz": suvi_bytes(),
+            ".jp2": jp2_bytes(),
+        }
+        self.listings: Dict[str, Callable[[datetime, int], List[str]]] = {
+            "jsoc2.stanford.edu": aia_names,
+            "data.ngdc.noaa.gov": suvi_names,
+        }
+        self.requests: int = 0
+        self.errors: int = 0
+        self.app = web.Application()
+        self.app.router.add_get("/{host}/{path:.*}", self.handler)
+
+    async def handler(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        if self.random.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=503, headers={"Retry-After": "1"})
+        host: str = request.match_info["host"]
+        path: str = "/" + request.match_info["path"]
+        if path.endswith("/"):
+            return self.listing(host, path)
+        if (month := MONTH.search(path)) is not None:
+            return await self.stream(
+                request, dst_text(int(month.group(1)), int(month.group(2)))
+            )
+        for suffix in sorted(self.products, key=len, reverse=True):
+            if path.endswith(suffix):
+                return await self.stream(request, self.products[suffix])
+        return web.Response(status=404, text="404 Not Found")
+
+    def listing(self, host: str, path: str) -> web.Response:
+        date = DATE.search(path)
+        if host not in self.listings or date is None:
+            return web.Response(status=404, text="404 Not Found")
+        day = datetime(*map(int, date.groups()))
+        names: List[str] = self.listings[host](day, self.listing_size)
+        return web.Response(text=listing(names), content_type="text/html")
+
+    async def stream(self, request: web.Request, body: bytes) -> web.StreamResponse:
+        response = web.StreamResponse()
+        response.content_type = "application/octet-stream"
+        response.content_length = len(body)
+        await response.prepare(request)
+        if request.method == "HEAD":
+            return response
+        for start in range(0, len(body), CHUNK_SIZE):
+            chunk: bytes = body[start : start + CHUNK_SIZE]
+            await response.write(chunk)
+            if self.bandwidth is not None:
+                await asyncio.sleep(len(chunk) / self.bandwidth)
+        await response.write_eof()
+        return response
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Serves the archive in the running loop, returns its base URL.
+        """
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        await self.runner.cleanup()
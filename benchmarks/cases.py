@@ -0,0 +1,84 @@
+from starstream import ACE, GOES16, PROBA_2, SDO, Dst, Metrics
+from starstream.downloader import downloader
+from dateutil.relativedelta import relativedelta
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Tuple, Union
+import asyncio
+import resource
+import sys
+import time
+
+# name -> (factory from root, attribute holding the URL builder, step of the interval)
+CASES: Dict[str, Tuple[Callable[[str], Any], str, Union[timedelta, relativedelta]]] = {
+    "ACE.MAG": (lambda root: ACE.MAG(root), "url", timedelta(days=1)),
+    "SDO.AIA_HR": (lambda root: SDO.AIA_HR(171, root), "url", timedelta(days=1)),
+    "GOES16": (lambda root: GOES16("fe171", root=root), "url", timedelta(days=1)),
+    "Dst": (lambda root: Dst(root), "_date_to_url", relativedelta(months=1)),
+    "PROBA_2.LYRA": (lambda root: PROBA_2.LYRA(root), "url", timedelta(days=1)),
+}
+
+
+def rebase(func: Callable[..., str], base: str) -> Callable[..., str]:
+    """
+    Points a URL builder at the local archive, keeping the host and path of the real one.
+    """
+
+    def local(*args) -> str:
+        return f"{base}/{func(*args).split('://', 1)[1]}"
+
+    return local
+
+
+def peak_rss() -> float:
+    """
+    Peak resident set size of this process in MB.
+    """
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+def run_case(
+    name: str,
+    base: str,
+    root: str,
+    start: datetime,
+    steps: int,
+    scheduler: str = "pipeline",
+) -> Dict[str, Any]:
+    """
+    Downloads steps days (months for Dst) of name from the local archive with
+    DataDownloading's downloader, meant to run in a fresh process so the
+    peak RSS belongs to this case alone.
+    """
+    factory, attribute, step = CASES[name]
+    obj = factory(root)
+    setattr(obj, attribute, rebase(getattr(obj, attribute), base))
+    scrap_date = (start, start + step * (steps - 1))
+    totals: Dict[str, float] = {"files": 0, "bytes": 0, "retries": 0}
+
+    def collect(event: Dict[str, Any]) -> None:
+        if event["stage"] == "transfer" and event.get("bytes"):
+            totals["files"] += 1
+            totals["bytes"] += event["bytes"]
+        elif event["stage"] == "retry":
+            totals["retries"] += 1
+
+    metrics = Metrics()
+    metrics.subscribe(collect)
+    elapsed: float = time.perf_counter()
+    asyncio.run(
+        downloader([obj], scrap_date, scheduler, journal=False, metrics=metrics)
+    )
+    elapsed = time.perf_counter() - elapsed
+    failures: int = sum(row["failures"] for row in metrics.summary())
+    return {
+        "case": name,
+        "files": int(totals["files"]),
+        "mb": totals["bytes"] / (1 << 20),
+        "seconds": elapsed,
+        "files_per_s": totals["files"] / elapsed,
+        "mb_per_s": totals["bytes"] / (1 << 20) / elapsed,
+        "retries": int(totals["retries"]),
+        "failures": failures,
+        "peak_rss_mb": peak_rss(),
+    }
@@ -64,7 +64,7 @@ if __name__ == "__main__":
     setup(
         name="starstream",
         version=__version__,
-        packages=find_packages(exclude=["tests*", "docs*"]),
+        packages=find_packages(exclude=["tests*", "docs*", "benchmarks*"]),
         author="Jorge David Enciso Martínez",
         author_email="jorged.encyso@gmail.com",
         description="Asynchronous satellite data downloading for CDAWeb, JSOC, etc.",
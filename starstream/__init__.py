@@ -11,6 +11,15 @@ from .soho import *
 from .swarm import *
 from .wind import *
 from .goes import *
+from .align import *
+from ._executor import (
+    set_prep_workers,
+    set_thread_workers,
+    shutdown_executors,
+)
+from ._cache import RawCache
+from ._results import ResultCache, set_result_cache
+from ._metrics import Metrics
 from ._version import __version__
 
 __author__ = "Jorgedavyd"
@@ -1,19 +1,68 @@
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from dateutil.relativedelta import relativedelta
 from spacepy import pycdf
 from starstream._utils import (
+    SCHEDULERS,
+    Throughput,
     async_batch,
+    async_pipeline,
     create_scrap_date,
     download_url_write,
     find_files_daily,
     find_files_glob,
     StarDate,
     coroutine_handler,
+    head_size,
     StarInterval,
+    split_interval,
+    to_polars,
 )
+from aiohttp import ClientError
+from starstream._executor import (
+    prep_pool,
+    run_cpu,
+    run_io,
+    set_prep_workers,
+    shutdown_prep_workers,
+    thread_pool,
+)
+from starstream._cache import RawCache
+from starstream._catalog import Catalog, overlaps, to_ms
+from starstream._inventory import Inventory
+from starstream._journal import Journal
+from starstream._storage import (
+    extension,
+    partition,
+    read_table,
+    scan_hive,
+    scan_table,
+    write_table,
+)
+from starstream._metrics import Metrics, record, timed
+from starstream._resample import (
+    COMPONENTS,
+    Agg,
+    combine,
+    decomposable,
+    resample,
+    rollup,
+)
+from starstream._results import result_cache
 from starstream.typing import ScrapDate
 from PIL import Image
-from typing import Any, Callable, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 from datetime import timedelta, datetime
 from numpy._typing import NDArray
 from torch import Tensor
@@ -26,12 +75,62 @@ import aiofiles
 import asyncio
 import torch
 import os
-import numpy as np
-import torch
 from astropy.io import fits
 from io import BytesIO
-import os.path as osp
 from scipy.ndimage import zoom
+import gzip
+import shutil
+import tempfile
+import threading
+import time
+
+MISSING_TTL: timedelta = timedelta(days=30)
+
+
+@dataclass
+class Plan:
+    """
+    What a fetch of scrap_date would download, as discovered by Satellite.plan.
+
+    Args:
+    satellite (str): Qualified name of the satellite class it was made for.
+    scrap_date (List[Tuple[datetime, datetime]]): Planned intervals.
+    urls (List[str]): Files to download.
+    paths (List[str]): Where each file is written.
+    targets (Dict[str, List[int]]): Date -> indices of its urls.
+    sizes (List[Optional[int]]): Content-Length of each url, None when unknown.
+    local (List[str]): Dates already available locally.
+    unresolved (List[str]): Dates whose discovery failed, scraped again on fetch.
+    """
+
+    satellite: str
+    scrap_date: List[Tuple[datetime, datetime]]
+    urls: List[str] = field(default_factory=list)
+    paths: List[str] = field(default_factory=list)
+    targets: Dict[str, List[int]] = field(default_factory=dict)
+    sizes: List[Optional[int]] = field(default_factory=list)
+    local: List[str] = field(default_factory=list)
+    unresolved: List[str] = field(default_factory=list)
+
+    @property
+    def bytes(self) -> int:
+        return sum(size for size in self.sizes if size is not None)
+
+    @property
+    def unknown(self) -> int:
+        return sum(size is None for size in self.sizes)
+
+    def __str__(self) -> str:
+        out: str = (
+            f"{self.satellite}: {len(self.urls)} files over {len(self.targets)} dates, "
+            f"{self.bytes / (1 << 20):.2f} MB"
+        )
+        if self.unknown:
+            out += f" ({self.unknown} sizes unknown)"
+        out += f", {len(self.local)} dates already local"
+        if self.unresolved:
+            out += f", {len(self.unresolved)} dates unresolved"
+        return out
 
 
 @dataclass
@@ -44,10 +143,189 @@ class Satellite:
     dates: List[StarDate] = field(default_factory=list)
     paths: List[str] = field(default_factory=list)
     urls: List[str] = field(default_factory=list)
+    targets: Dict[int, List[int]] = field(default_factory=dict)
+    journal: Optional[Journal] = field(default=None, repr=False)
+    metrics: Optional[Metrics] = field(default=None, repr=False)
+    cache: Optional[RawCache] = field(default=None, repr=False)
+    processing_version: ClassVar[int] = 1
+
+    def _thread(self) -> threading.local:
+        """
+        State of the calling thread: queries run on several threads (align,
+        iter_polars) and SQLite connections cannot cross them.
+        """
+        state: Optional[threading.local] = self.__dict__.get("_thread_state")
+        if state is None:
+            state = self.__dict__.setdefault("_thread_state", threading.local())
+        return state
+
+    @property
+    def inventory(self) -> Optional[Inventory]:
+        return getattr(self._thread(), "inventory", None)
+
+    @inventory.setter
+    def inventory(self, inventory: Optional[Inventory]) -> None:
+        self._thread().inventory = inventory
+
+    @property
+    def catalog(self) -> Optional[Catalog]:
+        return getattr(self._thread(), "catalog", None)
+
+    @catalog.setter
+    def catalog(self, catalog: Optional[Catalog]) -> None:
+        self._thread().catalog = catalog
 
     def scrap_path(self, date: str) -> str:
         return self.filepath(date)
 
+    def _targets(self, idx: int, urls: List[str], paths: List[str]) -> None:
+        """
+        Registers the URLs found for self.dates[idx] and the paths they are written to.
+        Populates:
+            self.urls (List[str]) -> (List[str])
+            self.paths (List[str]) -> (List[str])
+            self.targets (Dict[int, List[int]]) -> (Dict[int, List[int]])
+        """
+        start: int = len(self.urls)
+        self.urls.extend(urls)
+        self.paths.extend(paths)
+        self.targets.setdefault(idx, []).extend(range(start, len(self.urls)))
+        if self.cache is not None:
+            self.cache.want(urls)
+        if self.journal is not None:
+            self.journal.plan(self.dates[idx].str(), urls, paths)
+
+    @contextmanager
+    def _scanned(self) -> Iterator[Inventory]:
+        """
+        Lookups of _find_local inside the block share one scan of each directory.
+        """
+        if self.inventory is not None:
+            yield self.inventory
+            return
+        self.inventory = Inventory()
+        try:
+            yield self.inventory
+        finally:
+            self.inventory = None
+
+    def _files(self) -> Inventory:
+        return self.inventory if self.inventory is not None else Inventory()
+
+    @contextmanager
+    def _cataloged(self) -> Iterator[Optional[Catalog]]:
+        """
+        The catalog of root for the block, None if root has none yet.
+        """
+        if self.catalog is not None or not osp.exists(
+            osp.join(self.root, Journal.filename)
+        ):
+            yield self.catalog
+            return
+        self.catalog = Catalog(self.root, self.__class__.__qualname__)
+        try:
+            yield self.catalog
+        finally:
+            self.catalog.close()
+            self.catalog = None
+
+    def _span(self, date: StarDate) -> Tuple[int, int]:
+        return to_ms(date.date), to_ms(date.date + self.date_sampling)
+
+    def _rows(self, path: str) -> Optional[int]:
+        _ = path
+        return None
+
+    def _local_files(self, date: StarDate) -> List[str]:
+        found = self._find_local(date)
+        if isinstance(found, tuple):
+            return list(found[1] or []) if found[0] else []
+        return [self.scrap_path(date.str())] if found else []
+
+    def _register(self, date: StarDate, files: List[str]) -> None:
+        self.catalog.add(
+            date.str(),
+            self._span(date),
+            [(path, self._rows(path)) for path in files if osp.exists(path)],
+            self.processing_version,
+        )
+
+    def _locate(
+        self, interval: StarInterval, current: bool = True
+    ) -> Dict[str, List[str]]:
+        """
+        Local files of each date of interval. The catalog answers for the dates
+        it knows, the others are looked up with _find_local. With current (a
+        fetch) those are added to the catalog, and dates whose files an older
+        processing_version wrote are empty so they are fetched again. Queries
+        pass current=False and never write to the catalog.
+        """
+        dates: List[StarDate] = list(interval)
+        out: Dict[str, List[str]] = {}
+        with self._scanned() as inventory, self._cataloged() as catalog:
+            if catalog is None or not dates:
+                return {date.str(): self._local_files(date) for date in dates}
+            spans: List[Tuple[int, int]] = [self._span(date) for date in dates]
+            span: Tuple[int, int] = (
+                min(start for start, _ in spans),
+                max(end for _, end in spans),
+            )
+            known = catalog.files(span)
+            stale = catalog.missing(span, self.processing_version) if current else []
+            for date, date_span in zip(dates, spans):
+                entries = known.get(date.str(), [])
+                if entries and all(inventory.exists(path) for path, _ in entries):
+                    out[date.str()] = (
+                        []
+                        if overlaps(stale, date_span)
+                        else [path for path, _ in entries]
+                    )
+                    continue
+                out[date.str()] = self._local_files(date)
+                if current:
+                    catalog.discard([path for path, _ in entries])
+                    if out[date.str()]:
+                        self._register(date, out[date.str()])
+        return out
+
+    def _catalog_fetched(self) -> None:
+        """
+        Records in the catalog the files of the dates the fetch completed.
+        """
+        if self.catalog is None:
+            return
+        with self._scanned():
+            for idx, date in enumerate(self.dates):
+                if self.targets.get(idx) and not self._pending(date):
+                    files: List[str] = self._local_files(date)
+                    if files:
+                        self._register(date, files)
+
+    def _url_date(self, url: str) -> Optional[datetime]:
+        for idx, positions in self.targets.items():
+            if idx < len(self.dates) and any(self.urls[p] == url for p in positions):
+                return self.dates[idx].date
+        return None
+
+    def _missing_ttl(self, url: str) -> timedelta:
+        """
+        How long a URL the archive reported as missing is skipped before it is
+        requested again. Recent dates may still be published, archived ones
+        do not appear after the fact.
+        """
+        date: Optional[datetime] = self._url_date(url)
+        if date is None:
+            return MISSING_TTL
+        age: timedelta = datetime.now() - date
+        if age < timedelta(days=7):
+            return timedelta(hours=1)
+        if age < timedelta(days=90):
+            return timedelta(days=1)
+        return MISSING_TTL
+
+    def _pending(self, date: StarDate) -> bool:
+        return self.journal is not None and self.journal.pending(date.str())
+
     async def _scrap_(self, idx: int) -> None:
         """
         Defines all URLs to be downloaded in order to complete the query.
@@ -85,11 +363,12 @@ class Satellite:
             create_scrap_date(scrap_date), self.date_sampling, self.format
         )
 
+        located: Dict[str, List[str]] = self._locate(new_scrap_date)
         for date in tqdm(
             new_scrap_date,
             desc=f"{self.__class__.__name__}: Looking for missing dates...",
         ):
-            if not self._find_local(date):
+            if not located[date.str()] or self._pending(date):
                 self.dates.append(date)
 
         if self.dates:
@@ -103,7 +382,18 @@ class Satellite:
             self.urls (List[str]) -> (List[str])
             self.paths (List[str]) -> (List[str])
         """
-        await self._scrap_(idx)
+        with timed(self, "scrape"):
+            if idx in self.targets:
+                return
+            if self.journal is None or idx >= len(self.dates):
+                return await self._scrap_(idx)
+            date: str = self.dates[idx].str()
+            restored = self.journal.restore(date)
+            if restored is not None:
+                return self._targets(idx, *restored)
+            await self._scrap_(idx)
+            if self.targets.get(idx):
+                self.journal.scraped(date)
 
     async def _download(self, idx: int) -> None:
         """
@@ -111,7 +401,23 @@ class Satellite:
         Changes:
             self.urls (List[str]) -> (List[str]) (pops one URL)
         """
-        await self._download_(idx)
+        with timed(self, "download", self._url(idx)):
+            if self.journal is None or idx >= len(self.urls):
+                return await self._download_(idx)
+            url, path = self.urls[idx], self.paths[idx]
+            if self.journal.state(url) in ("downloaded", "processed") and osp.exists(
+                path
+            ):
+                return
+            try:
+                await self._download_(idx)
+            except Exception:
+                self.journal.mark(url, "failed")
+                raise
+            if osp.exists(path):
+                self.journal.mark(url, "downloaded", osp.getsize(path))
+            else:
+                self.journal.mark(url, "failed")
 
     async def _preprocess(self, idx: int) -> None:
         """
@@ -119,16 +425,160 @@ class Satellite:
         Changes:
             self.paths (List[str]) -> (List[str | empty]) (pops the path)
         """
-        await self._prep_(idx)
+        with timed(self, "prep", self._url(idx)):
+            if self.journal is None or idx >= len(self.urls):
+                return await self._prep_(idx)
+            state: Optional[str] = self.journal.state(self.urls[idx])
+            if state == "processed":
+                return
+            await self._prep_(idx)
+            if state == "downloaded":
+                self.journal.mark(self.urls[idx], "processed")
+
+    def _url(self, idx: int) -> str:
+        return self.urls[idx] if idx < len(self.urls) else ""
+
+    def _reset(self) -> None:
+        self.dates, self.urls, self.paths, self.targets = [], [], [], {}
+
+    def _follow(self, plan: Plan) -> None:
+        """
+        Registers the URLs plan discovered for the dates still missing, so
+        they are not scraped again.
+        """
+        for idx, date in enumerate(self.dates):
+            indices: Optional[List[int]] = plan.targets.get(date.str())
+            if indices is not None and idx not in self.targets:
+                self._targets(
+                    idx,
+                    [plan.urls[i] for i in indices],
+                    [plan.paths[i] for i in indices],
+                )
+
+    def _open_journal(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        self.journal = Journal(self.root, self.__class__.__qualname__)
+        self.catalog = Catalog(self.root, self.__class__.__qualname__)
 
-    async def fetch(self, scrap_date: ScrapDate, session) -> None:
-        await coroutine_handler(self._interval_setup, scrap_date)
+    def _close_journal(self) -> None:
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        if self.catalog is not None:
+            self.catalog.close()
+            self.catalog = None
+
+    async def plan(
+        self,
+        scrap_date: ScrapDate,
+        session,
+        sizes: bool = True,
+        journal: bool = True,
+    ) -> Plan:
+        """
+        Runs discovery only: the dates, URLs and paths a fetch of scrap_date
+        would download, with their sizes from HEAD requests if sizes is set.
+        The result can be handed to fetch to download it without scraping again.
+        """
+        scrap_date = create_scrap_date(scrap_date)
+        self._reset()
+        if journal:
+            self._open_journal()
         self.session = session
-        await async_batch(
-            self,
-            ("_scrap", "_download", "_preprocess"),
-            f"{self.__class__.__name__}",
-        )
+        try:
+            await coroutine_handler(self._interval_setup, scrap_date)
+            semaphore = asyncio.Semaphore(max(1, self.batch_size))
+            unresolved: List[str] = []
+
+            async def scrap(idx: int) -> None:
+                async with semaphore:
+                    try:
+                        await self._scrap(idx)
+                    except (ClientError, asyncio.TimeoutError) as e:
+                        print(f"{self.__class__.__name__}: {e}")
+                        unresolved.append(self.dates[idx].str())
+
+            async def size(url: str) -> Optional[int]:
+                async with semaphore:
+                    return await head_size(self, url)
+
+            await asyncio.gather(*[scrap(idx) for idx in range(len(self.dates))])
+            dates: List[str] = [date.str() for date in self.dates]
+            return Plan(
+                self.__class__.__qualname__,
+                scrap_date,
+                list(self.urls),
+                list(self.paths),
+                {dates[idx]: list(indices) for idx, indices in self.targets.items()},
+                list(
+                    await asyncio.gather(*[size(url) for url in self.urls])
+                    if sizes
+                    else [None] * len(self.urls)
+                ),
+                [
+                    date.str()
+                    for date in StarInterval(
+                        scrap_date, self.date_sampling, self.format
+                    )
+                    if date.str() not in set(dates)
+                ],
+                unresolved,
+            )
+        finally:
+            self._close_journal()
+            self._reset()
+
+    async def fetch(
+        self,
+        scrap_date: ScrapDate,
+        session,
+        scheduler: str = "pipeline",
+        journal: bool = True,
+        metrics: Optional[Metrics] = None,
+        plan: Optional[Plan] = None,
+    ) -> Throughput:
+        """
+        Downloads and preprocesses the missing dates of scrap_date, or of the
+        plan made by Satellite.plan, in which case its URLs are not scraped again.
+        """
+        assert scheduler in SCHEDULERS, f"Not valid scheduler, must be {SCHEDULERS}"
+        if plan is not None:
+            assert (
+                plan.satellite == self.__class__.__qualname__
+            ), f"Not valid plan, made for {plan.satellite}"
+            scrap_date = plan.scrap_date
+        self._reset()
+        if journal:
+            self._open_journal()
+        self.metrics = metrics
+        self.session = session
+        self.cache = getattr(session, "cache", None)
+        try:
+            with timed(self, "setup"):
+                await coroutine_handler(self._interval_setup, scrap_date)
+                if plan is not None:
+                    self._follow(plan)
+            if scheduler == "batch":
+                throughput = await async_batch(
+                    self,
+                    ("_scrap", "_download", "_preprocess"),
+                    f"{self.__class__.__name__}",
+                )
+            else:
+                throughput = await async_pipeline(self, f"{self.__class__.__name__}")
+            record(
+                self,
+                "fetch",
+                elapsed=throughput.elapsed,
+                items=throughput.items,
+                failed=bool(throughput.failed),
+            )
+            return throughput
+        finally:
+            self._catalog_fetched()
+            self._close_journal()
+            self.metrics = None
+            self.cache = None
 
 
 class CSV(Satellite):
@@ -139,39 +589,251 @@ class CSV(Satellite):
         filepath: Optional[Callable] = None,
         date_sampling: Union[timedelta, relativedelta] = timedelta(days=1),
         format: str = "%Y%m%d",
+        storage: str = "csv",
+        layout: str = "flat",
     ) -> None:
         if filepath is None:
-            filepath = lambda date: osp.join(self.root, f"{date}.csv")
+            filepath = lambda date: osp.join(
+                self.root,
+                partition(datetime.strptime(date, self.format), self.layout),
+                f"{date}.{extension(self.storage)}",
+            )
         super().__init__(root, batch_size, filepath, date_sampling, format)
+        self.storage: str = storage
+        self.layout: str = layout
+        self.streaming: bool = False
+        self.window_label: str = "left"
+        self.window_closed: str = "left"
+        self.rollups: List[timedelta] = []
+
+    def rollup_path(self, date: str, resolution: timedelta) -> str:
+        """
+        Rollup of date at resolution, under rollup=<seconds>s/ in root.
+        """
+        return osp.join(
+            self.root,
+            f"rollup={int(resolution.total_seconds())}s",
+            partition(datetime.strptime(date, self.format), self.layout),
+            f"{date}.{extension(self.storage)}",
+        )
+
+    def _rollup_targets(self, date: str) -> List[Tuple[timedelta, str]]:
+        return [
+            (resolution, self.rollup_path(date, resolution))
+            for resolution in self.rollups
+        ]
+
+    async def _preprocess(self, idx: int) -> None:
+        """
+        Preprocess, then writes the rollups of the date once its last file is done.
+        """
+        await super()._preprocess(idx)
+        if not self.rollups or not self._scannable():
+            return
+        for date_idx, targets in self.targets.items():
+            if targets and targets[-1] == idx and date_idx < len(self.dates):
+                path: str = self.filepath(self.dates[date_idx].str())
+                if osp.exists(path):
+                    await run_cpu(
+                        write_rollups,
+                        path,
+                        self._rollup_targets(self.dates[date_idx].str()),
+                    )
+
+    def materialize(self, scrap_date: ScrapDate) -> None:
+        """
+        Writes the rollups of the local files of scrap_date, for data fetched
+        before rollups were set.
+        """
+        assert self._scannable(), "Not valid source, rollups need scannable files"
+        located: Dict[str, List[str]] = self._locate(
+            StarInterval(
+                create_scrap_date(scrap_date), self.date_sampling, self.format
+            ),
+            current=False,
+        )
+        for date, paths in located.items():
+            if paths:
+                write_rollups(self.filepath(date), self._rollup_targets(date))
+
+    def _rollup_for(
+        self, resolution: Optional[timedelta], agg: Agg
+    ) -> Optional[timedelta]:
+        """
+        Coarsest rollup resolution divides, when the query can be answered from it.
+        """
+        if (
+            resolution is None
+            or self.window_closed != "left"
+            or self.window_label == "datapoint"
+            or not decomposable(agg)
+        ):
+            return None
+        usable: List[timedelta] = [
+            step
+            for step in self.rollups
+            if step <= resolution and resolution % step == timedelta(0)
+        ]
+        return max(usable, default=None)
+
+    def _rolled(
+        self,
+        scrap_date: StarInterval,
+        step: timedelta,
+        columns: Optional[List[str]],
+    ) -> Optional[pl.LazyFrame]:
+        """
+        Lazy scan of the rollups at step of scrap_date, None if one is missing
+        or older than the files it was computed from.
+        """
+        located: Dict[str, List[str]] = self._locate(scrap_date, current=False)
+        paths: List[str] = []
+        for date, found in located.items():
+            if found:
+                paths.append(self.rollup_path(date, step))
+                if not fresh(paths[-1], found):
+                    return None
+        if not paths:
+            return None
+        lazy: pl.LazyFrame = scan_table(paths)
+        if columns is not None:
+            lazy = lazy.select(
+                "date",
+                *[f"{column}__{name}" for column in columns for name in COMPONENTS],
+            )
+        return lazy
+
+    def _rows(self, path: str) -> Optional[int]:
+        """
+        Rows of a Parquet file from its metadata, None for CSV rather than
+        parsing the whole file.
+        """
+        if not path.endswith(".parquet"):
+            return None
+        try:
+            return scan_table(path).select(pl.len()).collect().item()
+        except pl.exceptions.PolarsError:
+            return None
 
     def _get_df_unit(self, date: str) -> pl.DataFrame:
-        return pl.read_csv(self.filepath(date), try_parse_dates=True)
+        return read_table(self.filepath(date))
 
     def _get_df(self, scrap_date: StarInterval) -> pl.DataFrame:
-        return pl.concat([self._get_df_unit(date.str()) for date in scrap_date])
+        located: Dict[str, List[str]] = self._locate(scrap_date, current=False)
+        return pl.concat(
+            [self._get_df_unit(date) for date, paths in located.items() if paths]
+        )
+
+    def _scannable(self) -> bool:
+        """
+        Whether the files can be scanned as they are, _get_df_unit is not overridden.
+        """
+        return type(self)._get_df_unit is CSV._get_df_unit
+
+    def _scan(self, scrap_date: StarInterval) -> pl.LazyFrame:
+        """
+        Lazy scan of the files that hold scrap_date. Hive Parquet partitions
+        are pruned by month, otherwise the located files are scanned.
+        """
+        if self.layout == "hive" and self.storage == "parquet":
+            return scan_hive(
+                self.root,
+                scrap_date.interval[0].date,
+                scrap_date.interval[-1].date,
+            )
+        located: Dict[str, List[str]] = self._locate(scrap_date, current=False)
+        paths: List[str] = [path for paths in located.values() for path in paths]
+        if not paths:
+            raise ValueError(f"No local files in {self.root}")
+        return scan_table(paths)
+
+    def _result_key(
+        self,
+        scrap_date: List[Tuple[datetime, datetime]],
+        resolution: Optional[timedelta],
+        agg: Agg,
+        columns: Optional[List[str]],
+    ) -> Tuple:
+        return (
+            self.__class__.__qualname__,
+            osp.abspath(self.root),
+            self.storage,
+            self.layout,
+            tuple(tuple(interval) for interval in scrap_date),
+            resolution,
+            None if columns is None else tuple(columns),
+            repr(agg.__name__ if callable(agg) else agg),
+            self.window_label,
+            self.window_closed,
+            self._rollup_for(resolution, agg),
+        )
+
+    def _result_stamp(
+        self,
+        scrap_date: List[Tuple[datetime, datetime]],
+        step: Optional[timedelta] = None,
+    ) -> Tuple:
+        """
+        Paths, mtimes and sizes of the local files of scrap_date, and of their
+        rollups at step that exist.
+        """
+        located: Dict[str, List[str]] = self._locate(
+            StarInterval(scrap_date, self.date_sampling, self.format), current=False
+        )
+        paths: Set[str] = {path for paths in located.values() for path in paths}
+        if step is not None:
+            paths.update(
+                path
+                for path in (
+                    self.rollup_path(date, step)
+                    for date, found in located.items()
+                    if found
+                )
+                if osp.exists(path)
+            )
+        stamp: List[Tuple[str, int, int]] = []
+        for path in sorted(paths):
+            stat = os.stat(path)
+            stamp.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(stamp)
+
+    def _lazy(self, scrap_date: StarInterval) -> pl.LazyFrame:
+        if self._scannable():
+            return self._scan(scrap_date)
+        return self._get_df(scrap_date).lazy()
 
     def _convert_to_format(
         self,
         scrap_date: ScrapDate,
         resolution: Optional[timedelta] = None,
         method: str = None,
+        columns: Optional[List[str]] = None,
+        agg: Agg = "mean",
     ) -> Tuple[Any, ...]:
-        list_df: List[pl.DataFrame] = self._process_polars(scrap_date, resolution)
+        list_df: List[pl.DataFrame] = self._process_polars(
+            scrap_date, resolution, agg, columns
+        )
         return tuple([getattr(df.drop("date"), method)() for df in list_df])
 
     def get_numpy(
         self,
         scrap_date: Union[Tuple[datetime, datetime], List[Tuple[datetime, datetime]]],
         resolution: Optional[timedelta] = None,
+        columns: Optional[List[str]] = None,
+        agg: Agg = "mean",
     ) -> Tuple[NDArray, ...]:
-        return self._convert_to_format(scrap_date, resolution, "to_numpy")
+        return self._convert_to_format(scrap_date, resolution, "to_numpy", columns, agg)
 
     def get_pandas(
         self,
         scrap_date: Union[Tuple[datetime, datetime], List[Tuple[datetime, datetime]]],
         resolution: Optional[timedelta] = None,
+        columns: Optional[List[str]] = None,
+        agg: Agg = "mean",
     ) -> Tuple[pd.DataFrame, ...]:
-        list_df: List[pl.DataFrame] = self._process_polars(scrap_date, resolution)
+        list_df: List[pl.DataFrame] = self._process_polars(
+            scrap_date, resolution, agg, columns
+        )
         return tuple(
             [
                 df.to_pandas(date_as_object=False).set_index("date", drop=True)
@@ -183,8 +845,12 @@ class CSV(Satellite):
         self,
         scrap_date: Union[Tuple[datetime, datetime], List[Tuple[datetime, datetime]]],
         resolution: Optional[timedelta] = None,
+        columns: Optional[List[str]] = None,
+        agg: Agg = "mean",
     ) -> Tuple[Tensor, ...]:
-        list_df: List[pl.DataFrame] = self._process_polars(scrap_date, resolution)
+        list_df: List[pl.DataFrame] = self._process_polars(
+            scrap_date, resolution, agg, columns
+        )
         return tuple(
             [
                 torch.from_numpy(df.drop("date").to_numpy().astype(np.float32))
@@ -196,14 +862,94 @@ class CSV(Satellite):
         self,
         scrap_date: Union[Tuple[datetime, datetime], List[Tuple[datetime, datetime]]],
         resolution: Optional[timedelta] = None,
+        columns: Optional[List[str]] = None,
+        agg: Agg = "mean",
     ) -> Tuple[pl.DataFrame, ...]:
-        return tuple(self._process_polars(scrap_date, resolution))
+        return tuple(self._process_polars(scrap_date, resolution, agg, columns))
+
+    def iter_polars(
+        self,
+        scrap_date: Union[Tuple[datetime, datetime], List[Tuple[datetime, datetime]]],
+        chunk: Union[timedelta, relativedelta] = relativedelta(months=1),
+        resolution: Optional[timedelta] = None,
+        columns: Optional[List[str]] = None,
+        agg: Agg = "mean",
+    ) -> Iterator[pl.DataFrame]:
+        """
+        Yields scrap_date in time order as frames of at most chunk. Like
+        get_polars, the start of each interval is excluded, later chunks are
+        [start, end) so together they hold exactly what get_polars returns.
+        The next chunk is read on the shared thread pool while the current one
+        is consumed, so at most two are in memory whatever the range. Chunk
+        edges should fall on window edges of resolution. Chunks with no local
+        files are skipped, errors are raised.
+        """
+        spans: List[Tuple[Tuple[datetime, datetime], bool]] = [
+            (span, i > 0)
+            for interval in create_scrap_date(scrap_date)
+            for i, span in enumerate(split_interval(interval, chunk))
+        ]
+
+        def read(span: Tuple[datetime, datetime], resumed: bool) -> List[pl.DataFrame]:
+            located = self._locate(self._span_interval(span), current=False)
+            if not any(located.values()):
+                return []
+            return self._process_polars(
+                [span], resolution, agg, columns, chunked=True, resumed=resumed
+            )
+
+        pending = thread_pool().submit(read, *spans[0]) if spans else None
+        for i in range(len(spans)):
+            frames: List[pl.DataFrame] = pending.result()
+            if i + 1 < len(spans):
+                pending = thread_pool().submit(read, *spans[i + 1])
+            for df in frames:
+                if df.height:
+                    yield df
+
+    def _span_interval(self, *spans: Tuple[datetime, datetime]) -> StarInterval:
+        """
+        Dates of the files that may hold spans, from the file of each start on.
+        """
+        return StarInterval(
+            [
+                (datetime.strptime(start.strftime(self.format), self.format), end)
+                for start, end in spans
+            ],
+            self.date_sampling,
+            self.format,
+        )
+
+    def iter_numpy(
+        self,
+        scrap_date: Union[Tuple[datetime, datetime], List[Tuple[datetime, datetime]]],
+        chunk: Union[timedelta, relativedelta] = relativedelta(months=1),
+        resolution: Optional[timedelta] = None,
+        columns: Optional[List[str]] = None,
+        agg: Agg = "mean",
+    ) -> Iterator[NDArray]:
+        for df in self.iter_polars(scrap_date, chunk, resolution, columns, agg):
+            yield df.drop("date").to_numpy()
+
+    def iter_torch(
+        self,
+        scrap_date: Union[Tuple[datetime, datetime], List[Tuple[datetime, datetime]]],
+        chunk: Union[timedelta, relativedelta] = relativedelta(months=1),
+        resolution: Optional[timedelta] = None,
+        columns: Optional[List[str]] = None,
+        agg: Agg = "mean",
+    ) -> Iterator[Tensor]:
+        for df in self.iter_polars(scrap_date, chunk, resolution, columns, agg):
+            yield torch.from_numpy(df.drop("date").to_numpy().astype(np.float32))
 
     def _process_polars(
         self,
         scrap_date: Union[ScrapDate, List[tuple]],
         resolution: Optional[timedelta] = None,
-        agg_func: Callable = pl.mean,
+        agg: Agg = "mean",
+        columns: Optional[List[str]] = None,
+        chunked: bool = False,
+        resumed: bool = False,
     ) -> List[pl.DataFrame]:
         """
         Process data using Polars based on given scrap dates and optional resolution.
@@ -211,91 +957,124 @@ class CSV(Satellite):
         Args:
         scrap_date (Union[ScrapDate, List[tuple]]): Dates to process.
         resolution (Optional[timedelta]): Time resolution for aggregation. If None, no aggregation is performed.
-        agg_func (Callable): Aggregation function to use. Defaults to pl.mean.
+        agg (Agg): Aggregations of the resampling, a name (mean, min, max, std, median, count, first, last, sum), several, or a dict column -> names. Defaults to mean.
+        columns (Optional[List[str]]): Columns to read besides date, all of them if None.
+        chunked (bool): Intervals are chunks of iter_polars, read without the result cache and raising errors.
+        resumed (bool): The chunks continue a previous one, so their start is included.
 
         Returns:
         List[pl.DataFrame]: List of processed Polars DataFrames.
         """
         try:
             scrap_date = create_scrap_date(scrap_date)
-            out_list: List[pl.DataFrame] = []
-
-            for tuple_date in scrap_date:
-                new_scrap_date = StarInterval(
-                    [tuple_date], self.date_sampling, self.format
+            cache = None if chunked else result_cache()
+            if cache is not None:
+                key = self._result_key(scrap_date, resolution, agg, columns)
+                stamp = self._result_stamp(
+                    scrap_date, self._rollup_for(resolution, agg)
                 )
-                df: pl.DataFrame = self._get_df(new_scrap_date)
+                cached: Optional[List[pl.DataFrame]] = cache.get(key, stamp)
+                if cached is not None:
+                    return list(cached)
+            queries: List[pl.LazyFrame] = []
 
-                # Filter the dataframe to include only dates within the interval
-                df = df.filter(
-                    (pl.col("date") > new_scrap_date.interval[0].polars())
-                    & (pl.col("date") < new_scrap_date.interval[-1].polars())
+            for tuple_date in scrap_date:
+                if chunked:
+                    new_scrap_date = self._span_interval(tuple_date)
+                    lower, upper = tuple_date
+                else:
+                    new_scrap_date = StarInterval(
+                        [tuple_date], self.date_sampling, self.format
+                    )
+                    lower = new_scrap_date.interval[0].date
+                    upper = new_scrap_date.interval[-1].date
+                # Filter the dataframe to include only dates within the interval,
+                # chunks that continue another include their start so that
+                # their edges are read exactly once
+                after = pl.col("date") > to_polars(lower)
+                if resumed:
+                    after = pl.col("date") >= to_polars(lower)
+                within = after & (pl.col("date") < to_polars(upper))
+                step: Optional[timedelta] = self._rollup_for(resolution, agg)
+                rolled: Optional[pl.LazyFrame] = (
+                    None
+                    if step is None
+                    else self._rolled(new_scrap_date, step, columns)
                 )
+                if rolled is not None:
+                    # Whole windows come from the rollup, the partial first and
+                    # last ones from the files so edges are filtered as above
+                    first: datetime = pl.select(
+                        pl.lit(lower).dt.truncate(resolution)
+                    ).item()
+                    last: datetime = pl.select(
+                        pl.lit(upper).dt.truncate(resolution)
+                    ).item()
+                    whole = pl.col("date").is_between(
+                        first + resolution, last, closed="left"
+                    )
+                    within = within & ~whole
+                    # Only the files of the partial windows are scanned
+                    edges: StarInterval = (
+                        self._span_interval((lower, upper))
+                        if first + resolution >= last
+                        else self._span_interval(
+                            (lower, first + resolution), (last, upper)
+                        )
+                    )
+                    if any(self._locate(edges, current=False).values()):
+                        scan: pl.LazyFrame = self._lazy(edges)
+                    else:
+                        scan = self._lazy(new_scrap_date).head(0)
+                else:
+                    scan = self._lazy(new_scrap_date)
+                projection = pl.all() if columns is None else ["date", *columns]
+                lazy: pl.LazyFrame = scan.filter(within).select(projection)
 
                 if resolution is not None:
-                    resolution_seconds = int(resolution.total_seconds())
-                    df = df.with_columns(
+                    lazy = resample(
+                        lazy,
+                        resolution,
+                        agg,
+                        self.window_label,
+                        self.window_closed,
+                    )
+                if rolled is not None:
+                    lazy = pl.concat(
                         [
-                            (pl.col("date").cast(pl.Int64) / resolution_seconds)
-                            .floor()
-                            .alias("group")
+                            lazy,
+                            combine(
+                                rolled.filter(whole),
+                                resolution,
+                                agg,
+                                self.window_label,
+                            ).cast(dict(lazy.collect_schema())),
                         ]
-                    )
-                    df = (
-                        df.group_by("group")
-                        .agg(
-                            [
-                                pl.col("date").first().alias("date"),
-                                pl.all().exclude(["date", "group"]).apply(agg_func),
-                            ]
-                        )
-                        .sort("date")
-                    )
-                    df = df.drop("group")
-                out_list.append(df)
-            return out_list
+                    ).sort("date")
+                queries.append(lazy)
+            out: List[pl.DataFrame] = pl.collect_all(
+                queries, engine="streaming" if self.streaming else "auto"
+            )
+            if cache is not None:
+                cache.put(key, stamp, out)
+            return out
 
         except Exception as e:
+            if chunked:
+                raise
             print(f"An error occurred during processing: {str(e)}")
             return []
 
 
-class CDAWeb(CSV):
-    phy_obs: List[str]
-    variables: List[str]
-    url: Callable[[str], str]
+# The CDF library keeps global state (the selected CDF), so the thread pool
+# fallback of run_cpu must not open several files at once.
+CDF_LOCK = threading.Lock()
 
-    def __init__(
-        self,
-        root: str = "./data",
-        batch_size: int = 10,
-        date_sampling: Union[timedelta, relativedelta] = timedelta(days=1),
-        format: str = "%Y%m%d",
-    ) -> None:
-        super().__init__(
-            root,
-            batch_size,
-            lambda date: osp.join(self.root, f"{date}.csv"),
-            date_sampling,
-            format,
-        )
-        self.cdf_path = lambda date: osp.join(self.root, f"{date}.cdf")
-
-    async def _scrap_(self, idx: int) -> None:
-        self.paths.extend(
-            [
-                self.cdf_path(date.str())
-                for date in self.dates[idx : idx + self.batch_size]
-            ]
-        )
-        self.urls.extend(
-            [self.url(date.str()) for date in self.dates[idx : idx + self.batch_size]]
-        )
 
-    async def _download_(self, idx: int) -> None:
-        return await download_url_write(self, idx)
-
-    def processing(self, cdf_file, date: str) -> None:
+def cdf_processing(
+    path: str, csv_path: str, phy_obs: List[str], variables: List[str]
+) -> None:
+    with CDF_LOCK, pycdf.CDF(path) as cdf_file:
         epoch = cdf_file["Epoch"][:]
         if epoch is None:
             raise ValueError("Epoch is None")
@@ -309,7 +1088,7 @@ class CDAWeb(CSV):
                 raise ValueError("Data is None")
 
         data_columns: List[NDArray] = []
-        for var in self.phy_obs:
+        for var in phy_obs:
             data = cdf_file[var][:]
             shape = data.shape
             if len(shape) == 1:
@@ -318,13 +1097,82 @@ class CDAWeb(CSV):
                 data_columns.append(data_func(var))
             else:
                 raise ValueError("Found singularity")
-        data_columns = np.concatenate(data_columns, -1).astype(np.float32).T
-        time = pl.from_numpy(epoch, schema=["date"], orient="col").cast(
-            {"date": pl.Datetime}
+    data_columns = np.concatenate(data_columns, -1).astype(np.float32).T
+    time = pl.from_numpy(epoch, schema=["date"], orient="col").cast(
+        {"date": pl.Datetime}
+    )
+    output = pl.from_numpy(data_columns, schema=variables, orient="col")
+    output = output.with_columns(time)
+    write_table(output, csv_path)
+
+
+def fresh(path: str, sources: List[str]) -> bool:
+    """
+    Whether path exists and is not older than any of sources.
+    """
+    return osp.exists(path) and all(
+        osp.getmtime(path) >= osp.getmtime(source) for source in sources
+    )
+
+
+def write_rollups(path: str, rollups: List[Tuple[timedelta, str]]) -> None:
+    """
+    Writes the rollup of the table at path for each (resolution, rollup path)
+    that is missing or older than the table.
+    """
+    for resolution, rollup_path in rollups:
+        if fresh(rollup_path, [path]):
+            continue
+        write_table(
+            rollup(scan_table(path), resolution).collect(), rollup_path, compact=False
         )
-        output = pl.from_numpy(data_columns, schema=self.variables, orient="col")
-        output = output.with_columns(time)
-        output.write_csv(self.filepath(date))
+
+
+def cdf_reprocess(
+    raw_path: str, csv_path: str, phy_obs: List[str], variables: List[str]
+) -> None:
+    """
+    Rebuilds csv_path from the gzipped CDF kept at raw_path by the raw store.
+    """
+    os.makedirs(osp.dirname(csv_path), exist_ok=True)
+    descriptor, path = tempfile.mkstemp(suffix=".cdf", dir=osp.dirname(csv_path))
+    try:
+        with gzip.open(raw_path, "rb") as source, open(descriptor, "wb") as target:
+            shutil.copyfileobj(source, target)
+        cdf_processing(path, csv_path, phy_obs, variables)
+    finally:
+        if osp.exists(path):
+            os.remove(path)
+
+
+class CDAWeb(CSV):
+    phy_obs: List[str]
+    variables: List[str]
+    url: Callable[[str], str]
+
+    def __init__(
+        self,
+        root: str = "./data",
+        batch_size: int = 10,
+        date_sampling: Union[timedelta, relativedelta] = timedelta(days=1),
+        format: str = "%Y%m%d",
+        storage: str = "csv",
+        layout: str = "flat",
+    ) -> None:
+        super().__init__(root, batch_size, None, date_sampling, format, storage, layout)
+        self.cdf_path = lambda date: osp.join(self.root, f"{date}.cdf")
+        self.keep_raw: bool = False
+
+    def _interval_setup(self, scrap_date: ScrapDate) -> None:
+        super()._interval_setup(scrap_date)
+        for idx, date in enumerate(self.dates):
+            self._targets(idx, [self.url(date.str())], [self.cdf_path(date.str())])
+
+    async def _scrap_(self, idx: int) -> None:
+        _ = idx
+
+    async def _download_(self, idx: int) -> None:
+        return await download_url_write(self, idx)
 
     async def _prep_(self, idx: int):
         try:
@@ -333,43 +1181,98 @@ class CDAWeb(CSV):
         except IndexError:
             return
 
-        with pycdf.CDF(path) as cdf_file:
-            self.processing(cdf_file, date)
+        if not osp.exists(path):
+            return
+
+        await self.processing(path, date)
+        if self.keep_raw:
+            await run_io(self.raw_store().put, self.url(date), path)
         os.remove(path)
 
+    def raw_store(self) -> RawCache:
+        """
+        Where keep_raw stores the CDFs, gzipped and keyed by their URL.
+        """
+        return RawCache(osp.join(self.root, "raw"), keep=True, compress=True)
 
-@dataclass
-class Img(Satellite):
-    def _find_local(self, date: StarDate) -> Tuple[bool, List[str]]:
-        return find_files_glob(self, date.str())
+    async def processing(self, path: str, date: str) -> None:
+        """
+        Extracts phy_obs from the CDF at path into the table of date.
+        """
+        await run_cpu(
+            cdf_processing, path, self.filepath(date), self.phy_obs, self.variables
+        )
 
-    def _interval_setup(self, scrap_date: ScrapDate) -> None:
-        new_scrap_date = StarInterval(
-            create_scrap_date(scrap_date), self.date_sampling, self.format
+    async def async_reprocess(self, scrap_date: ScrapDate) -> Throughput:
+        """
+        Rebuilds the CSV files of scrap_date from the raw CDFs kept with
+        keep_raw, on the preprocessing executor and without network. Decoding
+        only runs in parallel on a process pool, threads share the CDF library.
+        Dates with no raw file are reported as failed.
+        """
+        start: float = time.perf_counter()
+        store: RawCache = self.raw_store()
+        raw: Dict[str, str] = {
+            date.str(): store.path(self.url(date.str()))
+            for date in StarInterval(
+                create_scrap_date(scrap_date), self.date_sampling, self.format
+            )
+        }
+        stored: List[str] = [date for date, path in raw.items() if osp.exists(path)]
+        os.makedirs(self.root, exist_ok=True)
+        await asyncio.gather(
+            *[
+                run_cpu(
+                    cdf_reprocess,
+                    raw[date],
+                    self.filepath(date),
+                    self.phy_obs,
+                    self.variables,
+                )
+                for date in stored
+            ]
+        )
+        throughput = Throughput(
+            len(stored),
+            time.perf_counter() - start,
+            [date for date in raw if date not in stored],
         )
+        print(f"{self.__class__.__name__} (reprocess): {throughput}")
+        return throughput
 
-        for date in tqdm(
-            new_scrap_date,
-            desc=f"{self.__class__.__name__}: Looking for missing dates...",
-        ):
-            if not self._find_local(date)[0]:
-                self.dates.append(date)
+    def reprocess(
+        self, scrap_date: ScrapDate, workers: Optional[int] = None
+    ) -> Throughput:
+        """
+        Sync entry point of async_reprocess on a process pool of workers,
+        os.cpu_count() by default unless prep workers are already set.
+        """
+        owned: bool = workers is not None or prep_pool() is None
+        if owned:
+            set_prep_workers(workers or os.cpu_count())
+        try:
+            return asyncio.run(self.async_reprocess(scrap_date))
+        finally:
+            if owned:
+                shutdown_prep_workers()
 
-        if self.dates:
-            os.makedirs(self.root, exist_ok=True)
+
+@dataclass
+class Img(Satellite):
+    def _find_local(self, date: StarDate) -> Tuple[bool, List[str]]:
+        return find_files_glob(self, date.str())
 
     def _path_prep(self, scrap_date: List[Tuple[datetime, datetime]]) -> List[str]:
         """
         Defines the path scrapping method that is used to get all files.
         """
-        out: List[str] = []
-        for date in StarInterval(
-            create_scrap_date(scrap_date), self.date_sampling, self.format
-        ):
-            filepaths = self._find_local(date)[-1]
-            if filepaths is not None:
-                out.extend(filepaths)
-        return out
+        located: Dict[str, List[str]] = self._locate(
+            StarInterval(
+                create_scrap_date(scrap_date), self.date_sampling, self.format
+            ),
+            current=False,
+        )
+        return [path for paths in located.values() for path in paths]
 
     def process_image(self, content: bytes) -> NDArray:
         image = Image.open(BytesIO(content))
@@ -386,19 +1289,13 @@ class Img(Satellite):
         async with aiofiles.open(path, mode="rb") as file:
             content = await file.read()
 
-        loop = asyncio.get_running_loop()
-        array = await loop.run_in_executor(None, self.process_fits, content)
-
-        return array
+        return await run_io(self.process_fits, content)
 
     async def load_img(self, path: str) -> NDArray:
         async with aiofiles.open(path, mode="rb") as file:
             content = await file.read()
 
-        loop = asyncio.get_running_loop()
-        array = await loop.run_in_executor(None, self.process_image, content)
-
-        return array
+        return await run_io(self.process_image, content)
 
     async def async_numpy(
         self,
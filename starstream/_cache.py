@@ -0,0 +1,186 @@
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set
+from urllib.parse import urlparse
+from starstream._executor import run_io
+from starstream._utils import fetch_part, part_path
+import asyncio
+import gzip
+import hashlib
+import os
+import os.path as osp
+import shutil
+
+
+class RawCache:
+    """
+    URL-keyed store of the raw files downloaded in a session, shared by all its
+    satellites. Concurrent requests for the same URL are coalesced into one
+    transfer, each satellite gets a hard link (or a copy across devices) of
+    the raw file. Unless keep is set, a file is removed as soon as every
+    satellite that registered its URL consumed it, and the rest when the
+    session closes; kept files are reused by later sessions without requests.
+
+    Args:
+    root (str): Directory of the raw files, it is removed on close when the
+    cache created it and nothing is kept.
+    keep (bool): Keep the raw files after they are consumed.
+    compress (bool): Store the raw files gzipped, they are decompressed when
+    placed.
+    """
+
+    def __init__(self, root: str, keep: bool = False, compress: bool = False) -> None:
+        self.root: str = root
+        self.keep: bool = keep
+        self.compress: bool = compress
+        self.made: Optional[str] = None
+        self.wants: Counter = Counter()
+        self.inflight: Dict[str, asyncio.Event] = {}
+        self.missing: Set[str] = set()
+        self.created: Set[str] = set()
+
+    def path(self, url: str) -> str:
+        digest: str = hashlib.sha1(url.encode()).hexdigest()[:16]
+        name: str = f"{digest}-{osp.basename(urlparse(url).path)}"
+        return osp.join(self.root, name + ".gz" if self.compress else name)
+
+    def want(self, urls: Iterable[str]) -> None:
+        """
+        Registers that a satellite will consume urls.
+        """
+        self.wants.update(urls)
+
+    def release(self, url: str) -> None:
+        """
+        A satellite consumed url, its raw file goes once nobody else wants it.
+        """
+        self.wants[url] -= 1
+        if self.wants[url] <= 0:
+            del self.wants[url]
+            if not self.keep:
+                self.remove(url)
+
+    def remove(self, url: str) -> None:
+        path: str = self.path(url)
+        if path in self.created and osp.exists(path):
+            os.remove(path)
+        self.created.discard(path)
+
+    async def get(self, obj, url: str) -> Optional[str]:
+        """
+        Path of the raw file of url, downloaded through obj's session unless it
+        is already cached or being downloaded by another satellite.
+        None when the archive does not have it.
+        """
+        path: str = self.path(url)
+        while True:
+            if osp.exists(path):
+                return path
+            if url in self.missing:
+                return None
+            if url not in self.inflight:
+                break
+            await self.inflight[url].wait()
+        self.inflight[url] = asyncio.Event()
+        try:
+            self.makedirs()
+            if not await fetch_part(obj, url, path):
+                self.missing.add(url)
+                return None
+            if self.compress:
+                await run_io(self.store, part_path(path), path)
+                os.remove(part_path(path))
+            else:
+                os.replace(part_path(path), path)
+            self.created.add(path)
+            return path
+        finally:
+            self.inflight.pop(url).set()
+
+    def put(self, url: str, source: str) -> str:
+        """
+        Stores the local file source as the raw file of url, returns its path.
+        """
+        path: str = self.path(url)
+        self.makedirs()
+        if self.compress:
+            self.store(source, path)
+        else:
+            place(source, path)
+        self.created.add(path)
+        return path
+
+    def store(self, source: str, path: str) -> None:
+        """
+        Gzips source into path, source may be the part file of path.
+        """
+        temp: str = path + ".tmp"
+        with open(source, "rb") as raw, gzip.open(temp, "wb") as target:
+            shutil.copyfileobj(raw, target)
+        os.replace(temp, path)
+
+    def makedirs(self) -> None:
+        """
+        Creates root, remembering the outermost directory that did not exist.
+        """
+        if self.made is None:
+            missing: str = osp.abspath(self.root)
+            while not osp.exists(osp.dirname(missing)):
+                missing = osp.dirname(missing)
+            if not osp.exists(missing):
+                self.made = missing
+        os.makedirs(self.root, exist_ok=True)
+
+    def link(self, url: str, raw: str, path: str) -> None:
+        """
+        Places the raw file of url at path and releases it.
+        """
+        try:
+            if self.compress:
+                with gzip.open(raw, "rb") as source, open(
+                    part_path(path), "wb"
+                ) as target:
+                    shutil.copyfileobj(source, target)
+                os.replace(part_path(path), path)
+            else:
+                place(raw, path)
+        finally:
+            self.release(url)
+
+    def close(self) -> None:
+        """
+        Removes what the session created unless the cache keeps raw files.
+        """
+        if self.keep:
+            return
+        for path in list(self.created):
+            if osp.exists(path):
+                os.remove(path)
+        self.created.clear()
+        self.wants.clear()
+        if self.made is None:
+            return
+        # Empty directories the cache created, from root up to the outermost one
+        path: str = osp.abspath(self.root)
+        while True:
+            try:
+                os.rmdir(path)
+            except OSError:
+                break
+            if path == self.made:
+                break
+            path = osp.dirname(path)
+        self.made = None
+
+
+def place(source: str, path: str) -> None:
+    """
+    Hard links source at path, or copies it across devices.
+    """
+    temp: str = part_path(path)
+    if osp.exists(temp):
+        os.remove(temp)
+    try:
+        os.link(source, temp)
+    except OSError:
+        shutil.copyfile(source, temp)
+    os.replace(temp, path)
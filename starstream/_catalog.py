@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from starstream._journal import Journal
+import os
+import os.path as osp
+import sqlite3
+import time
+
+Interval = Tuple[int, int]
+
+EPOCH: datetime = datetime(1970, 1, 1)
+
+
+def to_ms(date: datetime) -> int:
+    return (date - EPOCH) // timedelta(milliseconds=1)
+
+
+def merge(intervals: Iterable[Interval]) -> List[Interval]:
+    """
+    Sorted union of half-open [start, end) intervals.
+    """
+    out: List[Interval] = []
+    for start, end in sorted(intervals):
+        if out and start <= out[-1][1]:
+            out[-1] = (out[-1][0], max(out[-1][1], end))
+        else:
+            out.append((start, end))
+    return out
+
+
+def subtract(interval: Interval, covered: List[Interval]) -> List[Interval]:
+    """
+    Parts of interval outside the merged intervals of covered.
+    """
+    start, end = interval
+    out: List[Interval] = []
+    for left, right in covered:
+        if right <= start:
+            continue
+        if left >= end:
+            break
+        if left > start:
+            out.append((start, left))
+        start = max(start, right)
+    if start < end:
+        out.append((start, end))
+    return out
+
+
+def overlaps(intervals: List[Interval], interval: Interval) -> bool:
+    return any(start < interval[1] and interval[0] < end for start, end in intervals)
+
+
+class Catalog:
+    """
+    Durable record (SQLite under root, next to the journal) of the files each
+    satellite has on disk: the time span in milliseconds they cover, their
+    rows, size, modification time and the processing version that wrote them.
+    """
+
+    def __init__(self, root: str, satellite: str) -> None:
+        self.path: str = osp.join(root, Journal.filename)
+        self.satellite: str = satellite
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        with self.connection:
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS catalog (
+                    satellite TEXT, path TEXT, date TEXT, start_ms INTEGER,
+                    end_ms INTEGER, rows INTEGER, size INTEGER, mtime REAL,
+                    version INTEGER, updated REAL,
+                    PRIMARY KEY (satellite, path))""")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS catalog_span ON catalog (satellite, start_ms)"
+            )
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def add(
+        self,
+        date: str,
+        span: Interval,
+        files: List[Tuple[str, Optional[int]]],
+        version: int,
+    ) -> None:
+        """
+        Replaces the entries of date with files, (path, rows) pairs covering span.
+        Paths that do not exist are not recorded.
+        """
+        now: float = time.time()
+        entries = []
+        for path, rows in files:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append(
+                (
+                    self.satellite,
+                    path,
+                    date,
+                    *span,
+                    rows,
+                    stat.st_size,
+                    stat.st_mtime,
+                    version,
+                    now,
+                )
+            )
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM catalog WHERE satellite = ? AND date = ?",
+                (self.satellite, date),
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO catalog VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                entries,
+            )
+
+    def discard(self, paths: Iterable[str]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM catalog WHERE satellite = ? AND path = ?",
+                [(self.satellite, path) for path in paths],
+            )
+
+    def files(self, span: Interval) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        date -> (path, version) of the entries overlapping span, in time order.
+        """
+        out: Dict[str, List[Tuple[str, int]]] = {}
+        for date, path, version in self.connection.execute(
+            """SELECT date, path, version FROM catalog WHERE satellite = ?
+            AND start_ms < ? AND end_ms > ? ORDER BY start_ms, path""",
+            (self.satellite, span[1], span[0]),
+        ):
+            out.setdefault(date, []).append((path, version))
+        return out
+
+    def coverage(self, span: Interval, version: int = 0) -> List[Interval]:
+        """
+        Merged time coverage inside span of the files written by version or later.
+        """
+        return merge(
+            (max(start, span[0]), min(end, span[1]))
+            for start, end in self.connection.execute(
+                """SELECT start_ms, end_ms FROM catalog WHERE satellite = ?
+                AND start_ms < ? AND end_ms > ? AND version >= ?""",
+                (self.satellite, span[1], span[0], version),
+            )
+        )
+
+    def missing(self, span: Interval, version: int = 0) -> List[Interval]:
+        """
+        Parts of span no file written by version or later covers.
+        """
+        return subtract(span, self.coverage(span, version))
+
+    def stats(self) -> Tuple[int, Optional[int], int]:
+        """
+        Files, rows and bytes recorded for the satellite.
+        """
+        return self.connection.execute(
+            """SELECT COUNT(*), SUM(rows), COALESCE(SUM(size), 0) FROM catalog
+            WHERE satellite = ?""",
+            (self.satellite,),
+        ).fetchone()
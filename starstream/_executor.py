@@ -0,0 +1,99 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+import multiprocessing
+import threading
+import asyncio
+
+## Library-owned executors, reused across files, satellites and event loops
+
+_lock = threading.Lock()
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_thread_workers: Optional[int] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+START: str = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def set_thread_workers(workers: Optional[int]) -> None:
+    """
+    Sizes the shared thread pool used for blocking file reads (CDF, FITS,
+    gzip, tar, zip, images), None uses the concurrent.futures default.
+    """
+    global _thread_workers
+    assert workers is None or workers > 0, "Not valid thread workers, must be > 0"
+    with _lock:
+        _thread_workers = workers
+    shutdown_thread_workers()
+
+
+def thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool
+    with _lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(
+                max_workers=_thread_workers, thread_name_prefix="starstream"
+            )
+        return _thread_pool
+
+
+def shutdown_thread_workers() -> None:
+    global _thread_pool
+    with _lock:
+        pool, _thread_pool = _thread_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def set_prep_workers(workers: Optional[int]) -> None:
+    """
+    Sizes the process pool used by the preprocessing stage, None disables it
+    and preprocessing runs on the shared thread pool. Workers are started by a
+    fork server (spawned where it is unavailable): forking the already
+    threaded interpreter can deadlock on locks held by the CDF library.
+    """
+    global _process_pool
+    assert workers is None or workers > 0, "Not valid prep_workers, must be > 0"
+    shutdown_prep_workers()
+    if workers is not None:
+        with _lock:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(START)
+            )
+
+
+def prep_pool() -> Optional[ProcessPoolExecutor]:
+    with _lock:
+        return _process_pool
+
+
+def shutdown_prep_workers() -> None:
+    global _process_pool
+    with _lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def shutdown_executors() -> None:
+    shutdown_thread_workers()
+    shutdown_prep_workers()
+
+
+async def run_io(func: Callable, *args: Any) -> Any:
+    """
+    Runs a blocking function on the shared thread pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(thread_pool(), func, *args)
+
+
+async def run_cpu(func: Callable, *args: Any) -> Any:
+    """
+    Runs a CPU-bound function off the event loop, on the process pool when
+    configured. func and args must be picklable (module-level functions).
+    """
+    if _process_pool is None:
+        return await run_io(func, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_process_pool, func, *args)
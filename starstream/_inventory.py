@@ -0,0 +1,73 @@
+from bisect import bisect_left
+from fnmatch import fnmatchcase
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import os
+import os.path as osp
+import re
+
+WILDCARD = re.compile(r"[*?\[]")
+
+
+class Inventory:
+    """
+    In-memory listing of the directories a satellite looks into: each one is
+    read once with os.scandir, then existence checks and glob patterns are
+    answered from the sorted names (a bisect over the literal prefix of the
+    pattern) instead of one stat or one glob per date.
+    """
+
+    def __init__(self) -> None:
+        self.names: Dict[str, List[str]] = {}
+        self.sets: Dict[str, Set[str]] = {}
+        self.indexes: Dict[Tuple[str, Callable], Dict[str, List[str]]] = {}
+
+    def listing(self, directory: str) -> List[str]:
+        directory = osp.normpath(directory)
+        if directory not in self.names:
+            try:
+                with os.scandir(directory) as entries:
+                    names = sorted(entry.name for entry in entries)
+            except (FileNotFoundError, NotADirectoryError):
+                names = []
+            self.names[directory] = names
+            self.sets[directory] = set(names)
+        return self.names[directory]
+
+    def exists(self, path: str) -> bool:
+        directory, name = osp.split(path)
+        self.listing(directory)
+        return name in self.sets[osp.normpath(directory)]
+
+    def glob(self, pattern: str) -> List[str]:
+        directory, name = osp.split(pattern)
+        if WILDCARD.search(directory):
+            raise ValueError(
+                f"Not valid pattern, wildcards only in file names: {pattern}"
+            )
+        names: List[str] = self.listing(directory)
+        match = WILDCARD.search(name)
+        prefix: str = name if match is None else name[: match.start()]
+        out: List[str] = []
+        for i in range(bisect_left(names, prefix), len(names)):
+            if not names[i].startswith(prefix):
+                break
+            hidden: bool = names[i].startswith(".") and not name.startswith(".")
+            if fnmatchcase(names[i], name) and not hidden:
+                out.append(osp.join(directory, names[i]))
+        return out
+
+    def index(
+        self, directory: str, key: Callable[[str], Optional[str]]
+    ) -> Dict[str, List[str]]:
+        """
+        key(name) -> files of directory, built in one pass for lookups that
+        are not a prefix of the file name.
+        """
+        if (osp.normpath(directory), key) not in self.indexes:
+            index: Dict[str, List[str]] = {}
+            for name in self.listing(directory):
+                value: Optional[str] = key(name)
+                if value is not None:
+                    index.setdefault(value, []).append(osp.join(directory, name))
+            self.indexes[(osp.normpath(directory), key)] = index
+        return self.indexes[(osp.normpath(directory), key)]
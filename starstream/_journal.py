@@ -0,0 +1,124 @@
+from typing import Iterable, List, Optional, Tuple
+import os.path as osp
+import sqlite3
+import time
+
+STATES: Tuple[str, ...] = ("planned", "downloaded", "processed", "failed")
+
+
+class Journal:
+    """
+    On-disk record (SQLite under root) of the URLs each satellite planned,
+    downloaded, processed or failed, so interrupted fetches can resume, and of
+    the URLs the archive reported as missing.
+    """
+
+    filename: str = ".starstream.sqlite"
+
+    def __init__(self, root: str, satellite: str) -> None:
+        self.path: str = osp.join(root, self.filename)
+        self.satellite: str = satellite
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS scraps (
+                    satellite TEXT, date TEXT, created REAL,
+                    PRIMARY KEY (satellite, date))""")
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS urls (
+                    satellite TEXT, url TEXT, path TEXT, date TEXT, state TEXT,
+                    size INTEGER, created REAL, updated REAL,
+                    PRIMARY KEY (satellite, url))""")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS urls_date ON urls (satellite, date)"
+            )
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS missing (
+                    satellite TEXT, url TEXT, expires REAL,
+                    PRIMARY KEY (satellite, url))""")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def plan(self, date: str, urls: Iterable[str], paths: Iterable[str]) -> None:
+        now: float = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO urls VALUES (?, ?, ?, ?, 'planned', NULL, ?, ?)",
+                [
+                    (self.satellite, url, path, date, now, now)
+                    for url, path in zip(urls, paths)
+                ],
+            )
+
+    def scraped(self, date: str) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO scraps VALUES (?, ?, ?)",
+                (self.satellite, date, time.time()),
+            )
+
+    def restore(self, date: str) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        URLs and paths of an already scraped date, None if it was never scraped.
+        """
+        if (
+            self.connection.execute(
+                "SELECT 1 FROM scraps WHERE satellite = ? AND date = ?",
+                (self.satellite, date),
+            ).fetchone()
+            is None
+        ):
+            return None
+        rows = self.connection.execute(
+            "SELECT url, path FROM urls WHERE satellite = ? AND date = ? ORDER BY rowid",
+            (self.satellite, date),
+        ).fetchall()
+        return [row[0] for row in rows], [row[1] for row in rows]
+
+    def mark(self, url: str, state: str, size: Optional[int] = None) -> None:
+        assert state in STATES, f"Not valid state, must be {STATES}"
+        with self.connection:
+            self.connection.execute(
+                """UPDATE urls SET state = ?, size = COALESCE(?, size), updated = ?
+                WHERE satellite = ? AND url = ?""",
+                (state, size, time.time(), self.satellite, url),
+            )
+
+    def state(self, url: str) -> Optional[str]:
+        row = self.connection.execute(
+            "SELECT state FROM urls WHERE satellite = ? AND url = ?",
+            (self.satellite, url),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def pending(self, date: str) -> bool:
+        """
+        Whether a planned URL of date has not been processed yet.
+        """
+        return (
+            self.connection.execute(
+                """SELECT 1 FROM urls WHERE satellite = ? AND date = ?
+                AND state != 'processed' LIMIT 1""",
+                (self.satellite, date),
+            ).fetchone()
+            is not None
+        )
+
+    def mark_missing(self, url: str, ttl: float) -> None:
+        """
+        Remembers for ttl seconds that url is not available on the archive.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO missing VALUES (?, ?, ?)",
+                (self.satellite, url, time.time() + ttl),
+            )
+
+    def known_missing(self, url: str) -> bool:
+        return (
+            self.connection.execute(
+                "SELECT 1 FROM missing WHERE satellite = ? AND url = ? AND expires > ?",
+                (self.satellite, url, time.time()),
+            ).fetchone()
+            is not None
+        )
@@ -0,0 +1,182 @@
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+import aiohttp
+import json
+import time
+
+
+@dataclass
+class Stat:
+    """
+    Aggregate of every event recorded for one (satellite, host, stage).
+    """
+
+    count: int = field(default=0)
+    elapsed: float = field(default=0.0)
+    max_elapsed: float = field(default=0.0)
+    bytes: int = field(default=0)
+    failures: int = field(default=0)
+    max_depth: int = field(default=0)
+
+    @property
+    def rate(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+
+class Metrics:
+    """
+    Registry of the stage-level events of a fetch: wall time of each scrape,
+    download, transfer, preprocessing, DNS resolution and connection, bytes
+    transferred, pipeline queue depth, retries and failures. Events are
+    aggregated per satellite, host and stage, handed to the subscribed
+    callbacks and, when path is given, appended to it as JSON lines together
+    with the aggregates once the registry is closed.
+
+    Args:
+    path (Optional[str]): JSON lines file the events are appended to.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path: Optional[str] = path
+        self.run: float = time.time()
+        self.stats: Dict[Tuple[str, str, str], Stat] = {}
+        self.callbacks: List[Callable[[Dict[str, Any]], None]] = []
+        self.file: Optional[IO] = None
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        self.callbacks.append(callback)
+
+    def record(
+        self,
+        stage: str,
+        satellite: str = "",
+        host: str = "",
+        elapsed: float = 0.0,
+        **fields: Any,
+    ) -> None:
+        stat: Stat = self.stats.setdefault((satellite, host, stage), Stat())
+        stat.count += 1
+        stat.elapsed += elapsed
+        stat.max_elapsed = max(stat.max_elapsed, elapsed)
+        stat.bytes += fields.get("bytes", 0)
+        stat.failures += bool(fields.get("failed", False))
+        stat.max_depth = max(stat.max_depth, fields.get("depth", 0))
+        event: Dict[str, Any] = {
+            "event": "stage",
+            "run": self.run,
+            "time": time.time(),
+            "stage": stage,
+            "satellite": satellite,
+            "host": host,
+            "elapsed": elapsed,
+            **fields,
+        }
+        for callback in self.callbacks:
+            callback(event)
+        self.write(event)
+
+    @contextmanager
+    def stage(
+        self, stage: str, satellite: str = "", host: str = "", **fields: Any
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Times the enclosed block, the yielded dict collects extra fields
+        (bytes, failed, ...) for the recorded event.
+        """
+        event: Dict[str, Any] = dict(fields)
+        start: float = time.perf_counter()
+        try:
+            yield event
+        except BaseException as e:
+            event["error"] = e.__class__.__name__
+            raise
+        finally:
+            self.record(stage, satellite, host, time.perf_counter() - start, **event)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "satellite": satellite,
+                "host": host,
+                "stage": stage,
+                **asdict(stat),
+                "rate": stat.rate,
+            }
+            for (satellite, host, stage), stat in sorted(self.stats.items())
+        ]
+
+    def write(self, event: Dict[str, Any]) -> None:
+        if self.path is None:
+            return
+        if self.file is None:
+            self.file = open(self.path, "a")
+        self.file.write(json.dumps(event, default=str) + "\n")
+
+    def close(self) -> None:
+        """
+        Appends the aggregates of this run and closes the JSON lines file.
+        """
+        if self.path is not None:
+            for row in self.summary():
+                self.write({"event": "summary", "run": self.run, **row})
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """
+        aiohttp hooks recording the DNS resolution and connection setup time per host.
+        """
+        trace = aiohttp.TraceConfig()
+
+        async def request_start(session, context, params) -> None:
+            context.host = params.url.host or ""
+
+        async def dns_start(session, context, params) -> None:
+            context.dns = time.perf_counter()
+
+        async def dns_end(session, context, params) -> None:
+            self.record("dns", "", params.host, time.perf_counter() - context.dns)
+
+        async def connect_start(session, context, params) -> None:
+            context.connect = time.perf_counter()
+
+        async def connect_end(session, context, params) -> None:
+            elapsed: float = time.perf_counter() - context.connect
+            self.record("connect", "", context.host, elapsed)
+
+        trace.on_request_start.append(request_start)
+        trace.on_dns_resolvehost_start.append(dns_start)
+        trace.on_dns_resolvehost_end.append(dns_end)
+        trace.on_connection_create_start.append(connect_start)
+        trace.on_connection_create_end.append(connect_end)
+        return trace
+
+
+def satellite_name(obj) -> str:
+    return obj.__class__.__qualname__
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).hostname or ""
+
+
+def record(obj, stage: str, url: str = "", **fields: Any) -> None:
+    """
+    Records an event of obj on its metrics registry, if any.
+    """
+    metrics: Optional[Metrics] = getattr(obj, "metrics", None)
+    if metrics is not None:
+        metrics.record(stage, satellite_name(obj), host_of(url), **fields)
+
+
+def timed(obj, stage: str, url: str = "", **fields: Any):
+    """
+    Metrics.stage for obj's registry, a no-op context when it has none.
+    """
+    metrics: Optional[Metrics] = getattr(obj, "metrics", None)
+    if metrics is None:
+        return nullcontext({})
+    return metrics.stage(stage, satellite_name(obj), host_of(url), **fields)
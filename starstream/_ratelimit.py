@@ -0,0 +1,99 @@
+from aiohttp import ClientConnectionError
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+import asyncio
+import time
+
+THROTTLE_STATUS: Tuple[int, ...] = (429, 503)
+
+
+class RateLimited(ClientConnectionError):
+    """
+    The archive answered 429/503, the host limiter has already backed off.
+    """
+
+    def __init__(self, url: str, status: int, retry_after: Optional[float]) -> None:
+        super().__init__(f"{url} throttled with status {status}")
+        self.url = url
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After header as seconds, it can be either delta-seconds or an HTTP-date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date: datetime = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostLimiter:
+    """
+    Token bucket (requests per second) plus an AIMD concurrency window for one
+    host. Throttling halves both and honours Retry-After, every success grows
+    them additively back towards the configured maximum.
+    """
+
+    def __init__(self, limit: int, rate: float, min_rate: float = 0.2) -> None:
+        assert limit > 0, "Not valid limit, must be > 0"
+        assert 0 < min_rate <= rate, "Not valid rate, must be >= min_rate > 0"
+        self.max_limit: float = float(limit)
+        self.limit: float = float(limit)
+        self.max_rate: float = rate
+        self.min_rate: float = min_rate
+        self.rate: float = rate
+        self.tokens: float = float(limit)
+        self.updated: float = time.monotonic()
+        self.paused_until: float = 0.0
+        self.in_flight: int = 0
+        self.condition = asyncio.Condition()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(
+            self.max_limit, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    async def acquire(self) -> None:
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        while True:
+            now: float = time.monotonic()
+            wait: float = self.paused_until - now
+            if wait <= 0:
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+    async def release(
+        self, throttled: bool = False, retry_after: Optional[float] = None
+    ) -> None:
+        async with self.condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+                self.rate = max(self.min_rate, self.rate / 2)
+                if retry_after is not None:
+                    self.paused_until = max(
+                        self.paused_until, time.monotonic() + retry_after
+                    )
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+            self.condition.notify_all()
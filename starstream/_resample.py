@@ -0,0 +1,163 @@
+from datetime import timedelta
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+import polars as pl
+
+AGGREGATIONS: Tuple[str, ...] = (
+    "mean",
+    "min",
+    "max",
+    "std",
+    "median",
+    "count",
+    "first",
+    "last",
+    "sum",
+)
+LABELS: Tuple[str, ...] = ("left", "right", "datapoint")
+CLOSED: Tuple[str, ...] = ("left", "right", "both", "none")
+
+Agg = Union[str, Callable, Sequence[str], Dict[str, Union[str, Sequence[str]]]]
+
+
+def plan(agg: Agg, columns: List[str]) -> List[Tuple[str, str, str]]:
+    """
+    (column, aggregation, output name) of agg: one name or several for every
+    column, or a dict column -> names. A column with one aggregation keeps
+    its name, with several each one is suffixed (Bnorm_mean, Bnorm_max, ...).
+    Callables such as pl.mean are taken by name.
+    """
+    if callable(agg):
+        agg = agg.__name__
+    if isinstance(agg, str):
+        agg = [agg]
+    if not isinstance(agg, dict):
+        agg = {column: agg for column in columns}
+    out: List[Tuple[str, str, str]] = []
+    for column, names in agg.items():
+        names = [names] if isinstance(names, str) else list(names)
+        for name in names:
+            assert (
+                name in AGGREGATIONS
+            ), f"Not valid aggregation, must be {AGGREGATIONS}"
+            out.append(
+                (column, name, column if len(names) == 1 else f"{column}_{name}")
+            )
+    return out
+
+
+def aggregations(agg: Agg, columns: List[str]) -> List[pl.Expr]:
+    return [
+        getattr(pl.col(column), name)().alias(alias)
+        for column, name, alias in plan(agg, columns)
+    ]
+
+
+def resample(
+    lazy: pl.LazyFrame,
+    resolution: timedelta,
+    agg: Agg = "mean",
+    label: str = "left",
+    closed: str = "left",
+) -> pl.LazyFrame:
+    """
+    Fixed windows of resolution over the date column, labelled by their
+    left or right edge or by their first datapoint.
+    """
+    assert label in LABELS, f"Not valid label, must be {LABELS}"
+    assert closed in CLOSED, f"Not valid closed, must be {CLOSED}"
+    columns: List[str] = [
+        name for name in lazy.collect_schema().names() if name != "date"
+    ]
+    return (
+        lazy.sort("date")
+        .group_by_dynamic("date", every=resolution, label=label, closed=closed)
+        .agg(aggregations(agg, columns))
+    )
+
+
+## Rollups: per-window components every decomposable aggregation is rebuilt from
+
+COMPONENTS: Tuple[str, ...] = ("sum", "count", "sumsq", "min", "max", "first", "last")
+DECOMPOSABLE: Tuple[str, ...] = (
+    "mean",
+    "min",
+    "max",
+    "std",
+    "count",
+    "first",
+    "last",
+    "sum",
+)
+
+
+def rollup(lazy: pl.LazyFrame, resolution: timedelta) -> pl.LazyFrame:
+    """
+    Left-closed windows of resolution with the components of each column
+    (column__sum, column__count, ...) in float64.
+    """
+    exprs: List[pl.Expr] = []
+    for column in lazy.collect_schema().names():
+        if column == "date":
+            continue
+        value: pl.Expr = pl.col(column).cast(pl.Float64)
+        exprs.extend(
+            [
+                value.sum().alias(f"{column}__sum"),
+                value.count().alias(f"{column}__count"),
+                (value * value).sum().alias(f"{column}__sumsq"),
+                value.min().alias(f"{column}__min"),
+                value.max().alias(f"{column}__max"),
+                value.first().alias(f"{column}__first"),
+                value.last().alias(f"{column}__last"),
+            ]
+        )
+    return lazy.sort("date").group_by_dynamic("date", every=resolution).agg(exprs)
+
+
+def component(column: str, name: str) -> pl.Expr:
+    total: pl.Expr = pl.col(f"{column}__sum").sum()
+    count: pl.Expr = pl.col(f"{column}__count").sum()
+    match name:
+        case "mean":
+            return total / count
+        case "std":
+            squares: pl.Expr = pl.col(f"{column}__sumsq").sum()
+            return ((squares - total * total / count) / (count - 1)).sqrt()
+        case "sum":
+            return total
+        case "count":
+            return count
+        case _:
+            return getattr(pl.col(f"{column}__{name}"), name)()
+
+
+def combine(
+    lazy: pl.LazyFrame, resolution: timedelta, agg: Agg = "mean", label: str = "left"
+) -> pl.LazyFrame:
+    """
+    resample of the raw data, computed from a rollup whose resolution divides
+    resolution.
+    """
+    assert label in LABELS, f"Not valid label, must be {LABELS}"
+    columns: List[str] = [
+        name[: -len("__sum")]
+        for name in lazy.collect_schema().names()
+        if name.endswith("__sum")
+    ]
+    return (
+        lazy.sort("date")
+        .group_by_dynamic("date", every=resolution, label=label)
+        .agg(
+            [
+                component(column, name).alias(alias)
+                for column, name, alias in plan(agg, columns)
+            ]
+        )
+    )
+
+
+def decomposable(agg: Agg) -> bool:
+    """
+    Whether every aggregation of agg can be rebuilt from a rollup.
+    """
+    return all(name in DECOMPOSABLE for _, name, _ in plan(agg, [""]))
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+import hashlib
+import json
+import os
+import os.path as osp
+import tempfile
+import threading
+import polars as pl
+
+## Process-wide cache of query results (CSV.get_*)
+
+_lock = threading.Lock()
+
+
+class ResultCache:
+    """
+    LRU cache of the frames of CSV queries within a byte budget. Entries
+    carry a stamp of the files they were read from (paths, mtimes, sizes), a
+    lookup with a different stamp is a miss and drops the entry. Frames are
+    copied in and out, so callers may modify what they get. With path,
+    results are also written there as Parquet files (within disk_budget) so
+    later processes start warm.
+
+    Args:
+    budget (int): Bytes of frames kept in memory.
+    path (Optional[str]): Directory of the disk tier, None disables it.
+    disk_budget (int): Bytes of the disk tier.
+    """
+
+    def __init__(
+        self,
+        budget: int = 512 * 2**20,
+        path: Optional[str] = None,
+        disk_budget: int = 4 * 2**30,
+    ) -> None:
+        assert budget >= 0, "Not valid budget, must be >= 0"
+        self.budget: int = budget
+        self.path: Optional[str] = path
+        self.disk_budget: int = disk_budget
+        self.entries: OrderedDict = OrderedDict()
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.lock = threading.Lock()
+
+    def digest(self, key: Hashable, stamp: Hashable) -> str:
+        return hashlib.sha1(repr((key, stamp)).encode()).hexdigest()
+
+    def get(self, key: Hashable, stamp: Hashable) -> Optional[List[pl.DataFrame]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return [df.clone() for df in entry[1]]
+            if entry is not None:
+                self._drop(key)
+        frames: Optional[List[pl.DataFrame]] = self._load(self.digest(key, stamp))
+        with self.lock:
+            if frames is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._keep(key, stamp, frames)
+        return [df.clone() for df in frames]
+
+    def put(self, key: Hashable, stamp: Hashable, frames: List[pl.DataFrame]) -> None:
+        self._keep(key, stamp, [df.clone() for df in frames])
+        self._store(self.digest(key, stamp), frames)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def _keep(self, key: Hashable, stamp: Hashable, frames: List[pl.DataFrame]) -> None:
+        nbytes: int = sum(df.estimated_size() for df in frames)
+        if nbytes > self.budget:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (stamp, frames, nbytes)
+            self.size += nbytes
+            while self.size > self.budget:
+                self._drop(next(iter(self.entries)))
+
+    def _drop(self, key: Hashable) -> None:
+        self.size -= self.entries.pop(key)[2]
+
+    def _load(self, digest: str) -> Optional[List[pl.DataFrame]]:
+        if self.path is None:
+            return None
+        marker: str = osp.join(self.path, f"{digest}.json")
+        try:
+            with open(marker) as file:
+                parts: int = json.load(file)["parts"]
+            frames = [
+                pl.read_parquet(osp.join(self.path, f"{digest}.{i}.parquet"))
+                for i in range(parts)
+            ]
+        except (FileNotFoundError, ValueError, KeyError, pl.exceptions.PolarsError):
+            return None
+        os.utime(marker)
+        return frames
+
+    def _store(self, digest: str, frames: List[pl.DataFrame]) -> None:
+        if self.path is None:
+            return
+
+        def marker(temp: str) -> None:
+            with open(temp, "w") as file:
+                json.dump({"parts": len(frames)}, file)
+
+        os.makedirs(self.path, exist_ok=True)
+        for i, df in enumerate(frames):
+            self._replace(f"{digest}.{i}.parquet", df.write_parquet)
+        self._replace(f"{digest}.json", marker)
+        self._prune()
+
+    def _replace(self, name: str, write: Callable[[str], Any]) -> None:
+        """
+        Writes name in the disk tier through a temporary file, so concurrent
+        readers never see it half written.
+        """
+        descriptor, temp = tempfile.mkstemp(prefix=f"{name}.", dir=self.path)
+        os.close(descriptor)
+        try:
+            write(temp)
+            os.replace(temp, osp.join(self.path, name))
+        finally:
+            if osp.exists(temp):
+                os.remove(temp)
+
+    def _prune(self) -> None:
+        """
+        Removes the least recently used results of the disk tier beyond disk_budget.
+        """
+        sizes: Dict[str, int] = {}
+        used: Dict[str, float] = {}
+        for entry in os.scandir(self.path):
+            digest: str = entry.name.split(".")[0]
+            sizes[digest] = sizes.get(digest, 0) + entry.stat().st_size
+            if entry.name.endswith(".json"):
+                used[digest] = entry.stat().st_mtime
+        total: int = sum(sizes.values())
+        for digest in sorted(used, key=used.get):
+            if total <= self.disk_budget:
+                break
+            for name in os.listdir(self.path):
+                if name.split(".")[0] == digest:
+                    os.remove(osp.join(self.path, name))
+            total -= sizes[digest]
+
+
+_cache: Optional[ResultCache] = None
+
+
+def set_result_cache(cache: Optional[ResultCache]) -> None:
+    """
+    Sets the cache of CSV query results, it is off until set. None disables it.
+    """
+    global _cache
+    with _lock:
+        _cache = cache
+
+
+def result_cache() -> Optional[ResultCache]:
+    with _lock:
+        return _cache
@@ -0,0 +1,139 @@
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+from starstream._cache import RawCache
+from starstream._metrics import Metrics, host_of
+from starstream._ratelimit import (
+    THROTTLE_STATUS,
+    HostLimiter,
+    RateLimited,
+    parse_retry_after,
+)
+import asyncio
+import aiohttp
+
+
+@dataclass
+class ConnectionPool:
+    """
+    Connection-pool settings shared by every satellite of a DataDownloading call.
+
+    Args:
+    limit (int): Global number of in-flight requests.
+    limit_per_host (int): Default number of in-flight requests per host.
+    hosts (Dict[str, int]): Per-host overrides of limit_per_host.
+    ttl_dns_cache (Optional[int]): Seconds a DNS resolution is reused, None disables the cache.
+    keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+    rate_per_host (float): Maximum requests per second to a single host.
+    min_rate_per_host (float): Floor the adaptive rate backs off to on 429/503.
+    """
+
+    limit: int = field(default=100)
+    limit_per_host: int = field(default=16)
+    hosts: Dict[str, int] = field(default_factory=dict)
+    ttl_dns_cache: Optional[int] = field(default=300)
+    keepalive_timeout: float = field(default=60.0)
+    rate_per_host: float = field(default=50.0)
+    min_rate_per_host: float = field(default=0.2)
+
+    def __post_init__(self) -> None:
+        assert self.limit > 0, "Not valid limit, must be > 0"
+        assert self.limit_per_host > 0, "Not valid limit_per_host, must be > 0"
+        assert (
+            0 < self.min_rate_per_host <= self.rate_per_host
+        ), "Not valid rate_per_host, must be >= min_rate_per_host > 0"
+        assert all(
+            value > 0 for value in self.hosts.values()
+        ), "Not valid host limit, must be > 0"
+
+    def host_limit(self, host: str) -> int:
+        return self.hosts.get(host, self.limit_per_host)
+
+    def connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=max([self.limit_per_host, *self.hosts.values()]),
+            use_dns_cache=self.ttl_dns_cache is not None,
+            ttl_dns_cache=self.ttl_dns_cache,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+
+
+class PooledSession:
+    """
+    aiohttp.ClientSession wrapper that enforces the per-host limits of a
+    ConnectionPool through adaptive HostLimiters, exposes the same get
+    interface as the session. With a Metrics registry, DNS resolution,
+    connection setup and time spent waiting on the host limiter are recorded.
+    A RawCache shares the downloaded raw files among the satellites using it.
+    """
+
+    def __init__(
+        self,
+        pool: Optional[ConnectionPool] = None,
+        metrics: Optional[Metrics] = None,
+        cache: Optional[RawCache] = None,
+    ) -> None:
+        self.pool: ConnectionPool = pool if pool is not None else ConnectionPool()
+        self.metrics: Optional[Metrics] = metrics
+        self.cache: Optional[RawCache] = cache
+        self.limiters: Dict[str, HostLimiter] = {}
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "PooledSession":
+        self.session = aiohttp.ClientSession(
+            connector=self.pool.connector(),
+            trace_configs=(
+                [self.metrics.trace_config()] if self.metrics is not None else None
+            ),
+        )
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        assert self.session is not None
+        await self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def limiter(self, url: str) -> HostLimiter:
+        host: str = urlparse(url).hostname or ""
+        if host not in self.limiters:
+            self.limiters[host] = HostLimiter(
+                self.pool.host_limit(host),
+                self.pool.rate_per_host,
+                self.pool.min_rate_per_host,
+            )
+        return self.limiters[host]
+
+    @asynccontextmanager
+    async def request(
+        self, method: str, url: str, **kwargs
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        assert self.session is not None, "Session not opened"
+        limiter: HostLimiter = self.limiter(url)
+        if self.metrics is None:
+            await limiter.acquire()
+        else:
+            with self.metrics.stage("wait", host=host_of(url)):
+                await limiter.acquire()
+        throttled: bool = False
+        retry_after: Optional[float] = None
+        try:
+            async with self.session.request(method, url, **kwargs) as response:
+                if response.status in THROTTLE_STATUS:
+                    throttled = True
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    raise RateLimited(url, response.status, retry_after)
+                yield response
+        except (asyncio.TimeoutError, aiohttp.ServerDisconnectedError):
+            throttled = True
+            raise
+        finally:
+            await limiter.release(throttled, retry_after)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url: str, **kwargs):
+        return self.request("HEAD", url, **kwargs)
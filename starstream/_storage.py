@@ -0,0 +1,98 @@
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+import os
+import os.path as osp
+import polars as pl
+import polars.selectors as cs
+
+STORAGES: Tuple[str, ...] = ("csv", "parquet")
+LAYOUTS: Tuple[str, ...] = ("flat", "hive")
+
+
+def extension(storage: str) -> str:
+    assert storage in STORAGES, f"Not valid storage, must be {STORAGES}"
+    return storage
+
+
+def partition(date: datetime, layout: str) -> str:
+    """
+    Directory of date under root, year=YYYY/month=MM for the hive layout.
+    """
+    assert layout in LAYOUTS, f"Not valid layout, must be {LAYOUTS}"
+    if layout == "flat":
+        return ""
+    return osp.join(f"year={date.year}", f"month={date.month:02d}")
+
+
+def month_key(date: datetime) -> int:
+    return date.year * 100 + date.month
+
+
+def scan_hive(root: str, start: datetime, end: datetime) -> pl.LazyFrame:
+    """
+    Lazy scan of the Parquet year=/month= partitions of root between start
+    and end, only the partitions of those months are opened.
+    """
+    key = pl.col("year") * 100 + pl.col("month")
+    return (
+        pl.scan_parquet(
+            osp.join(root, "year=*", "month=*", "*.parquet"),
+            hive_partitioning=True,
+        )
+        .filter(key.is_between(month_key(start), month_key(end)))
+        .drop(["year", "month"])
+    )
+
+
+def typed(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    float32 measurements and a datetime date column.
+    """
+    df = df.with_columns(cs.float().cast(pl.Float32))
+    if "date" in df.columns and df.schema["date"] == pl.String:
+        df = df.with_columns(pl.col("date").str.to_datetime())
+    return df
+
+
+def write_table(df: pl.DataFrame, path: str, compact: bool = True) -> None:
+    """
+    Writes df as Parquet (zstd) or CSV, after the extension of path. Parquet
+    floats are stored as float32 unless compact is False.
+    """
+    os.makedirs(osp.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".parquet"):
+        (typed(df) if compact else df).write_parquet(path, compression="zstd")
+    else:
+        df.write_csv(path)
+
+
+def read_table(path: str, columns: Optional[List[str]] = None) -> pl.DataFrame:
+    if path.endswith(".parquet"):
+        return pl.read_parquet(path, columns=columns)
+    return pl.read_csv(path, columns=columns, try_parse_dates=True)
+
+
+def scan_table(path: Union[str, List[str]]) -> pl.LazyFrame:
+    """
+    Lazy scan of path, or of the paths in order. Consecutive files of one
+    format share a scan, CSV and Parquet runs are concatenated with their
+    columns relaxed to a common type.
+    """
+    paths: List[str] = [path] if isinstance(path, str) else path
+    runs: List[List[str]] = []
+    for file in paths:
+        if runs and runs[-1][0].endswith(".parquet") == file.endswith(".parquet"):
+            runs[-1].append(file)
+        else:
+            runs.append([file])
+    frames: List[pl.LazyFrame] = [
+        (
+            pl.scan_parquet(run)
+            if run[0].endswith(".parquet")
+            else pl.scan_csv(run, try_parse_dates=True)
+        )
+        for run in runs
+    ]
+    if len(frames) == 1:
+        return frames[0]
+    return pl.concat(frames, how="diagonal_relaxed")
@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 import functools
 import aiofiles
 from tqdm import tqdm
-from aiohttp import ClientConnectionError
+from aiohttp import ClientConnectionError, ClientError, ClientPayloadError
 from dateutil.relativedelta import relativedelta
 from astropy.io import fits
 from spacepy import pycdf
@@ -11,9 +11,11 @@ from io import BytesIO
 import zipfile
 import asyncio
 import tarfile
+import time
 import gzip
 from inspect import iscoroutinefunction
 from typing import (
+    IO,
     Coroutine,
     Dict,
     Optional,
@@ -24,35 +26,35 @@ from typing import (
     Union,
 )
 from dataclasses import dataclass, field
-from itertools import chain
+from itertools import chain, count
+from contextvars import ContextVar
 import polars as pl
-from inspect import iscoroutinefunction
-from concurrent.futures import ThreadPoolExecutor
-from glob import glob
 import os.path as osp
+import os
 
+from starstream._executor import run_io
+from starstream._ratelimit import RateLimited
+from starstream._metrics import record, timed
 from starstream.typing import ScrapDate
 
 ## Asynchronous processing
 
 
-def syncGZ(file_obj: BytesIO):
-    return gzip.GzipFile(fileobj=file_obj)
+def syncGZ(obj: Union[str, IO[bytes]]):
+    return gzip.open(obj)
 
 
-def syncTAR(file_obj: BytesIO):
+def syncTAR(file_obj: IO[bytes]):
     return tarfile.open(fileobj=file_obj, mode="r")
 
 
 async def asyncGeneral(
-    obj: Union[str, BytesIO],
+    obj: Union[str, IO[bytes]],
     processing: Optional[Callable],
     read_method: Callable,
     *args,
 ) -> None:
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor() as thread:
-        general_file = await loop.run_in_executor(thread, read_method, obj)
+    general_file = await run_io(read_method, obj)
     if processing is not None:
         return await coroutine_handler(processing, general_file, *args)
     else:
@@ -60,35 +62,35 @@ async def asyncGeneral(
 
 
 async def asyncCDF(
-    obj: Union[str, BytesIO], processing: Optional[Callable] = None, *args
+    obj: Union[str, IO[bytes]], processing: Optional[Callable] = None, *args
 ) -> Any:
     return await asyncGeneral(obj, processing, pycdf.CDF, *args)
 
 
 async def asyncZIP(
-    obj: Union[str, BytesIO], processing: Optional[Callable] = None, *args
+    obj: Union[str, IO[bytes]], processing: Optional[Callable] = None, *args
 ) -> Any:
     return await asyncGeneral(obj, processing, zipfile.ZipFile, *args)
 
 
 async def asyncGZIP(
-    obj: Union[str, BytesIO], processing: Optional[Callable] = None, *args
+    obj: Union[str, IO[bytes]], processing: Optional[Callable] = None, *args
 ) -> Any:
     return await asyncGeneral(obj, processing, syncGZ, *args)
 
 
 async def asyncFITS(
-    obj: Union[str, BytesIO], processing: Optional[Callable] = None, *args
+    obj: Union[str, IO[bytes]], processing: Optional[Callable] = None, *args
 ) -> Any:
     return await asyncGeneral(obj, processing, fits.open, *args)
 
 
-async def asyncGZFITS(obj: Union[str, BytesIO], processing: Callable, *args) -> None:
+async def asyncGZFITS(obj: Union[str, IO[bytes]], processing: Callable, *args) -> None:
     gz_obj = await asyncGZIP(obj, lambda gzip_file: gzip_file.read())
     return await asyncFITS(BytesIO(gz_obj), processing, *args)
 
 
-async def asyncTAR(obj: Union[str, BytesIO], processing: Callable, *args) -> Any:
+async def asyncTAR(obj: Union[str, IO[bytes]], processing: Callable, *args) -> Any:
     return await asyncGeneral(obj, processing, syncTAR, *args)
 
 
@@ -174,6 +176,20 @@ class StarInterval:
         return iter(self.interval)
 
 
+def split_interval(
+    interval: Tuple[datetime, datetime], chunk: Union[timedelta, relativedelta]
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Consecutive spans of chunk that cover interval, the last one ends at its end.
+    """
+    start, end = interval
+    spans: List[Tuple[datetime, datetime]] = []
+    while start < end:
+        spans.append((start, min(start + chunk, end)))
+        start += chunk
+    return spans
+
+
 def mega_interval(*args) -> List[StarDate]:
     assert isinstance(args[0], tuple), "Not valid non-tuple argument"
     return [*chain.from_iterable([StarInterval(*arg) for arg in args])]
@@ -191,7 +207,7 @@ async def coroutine_handler(function: Union[Callable, Coroutine], *args: Any) ->
 
 ## Utils for scrap_date
 def assert_scrap_date(
-    scrap_date: Union[Sequence[Sequence[datetime]], Sequence[datetime]]
+    scrap_date: Union[Sequence[Sequence[datetime]], Sequence[datetime]],
 ):
     if isinstance(scrap_date[0], datetime):
         interval_len: int = len(scrap_date)
@@ -213,7 +229,31 @@ def create_scrap_date(scrap_date: ScrapDate):
 ## Utils for downloading
 
 
-async def async_batch(self, methods: Sequence[str], desc: str) -> None:
+@dataclass
+class Throughput:
+    items: int
+    elapsed: float
+    failed: List[str] = field(default_factory=list)
+
+    @property
+    def rate(self) -> float:
+        return self.items / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        out: str = (
+            f"{self.items} files in {self.elapsed:.2f}s ({self.rate:.2f} files/s)"
+        )
+        if self.failed:
+            out += f", {len(self.failed)} failed"
+        return out
+
+
+SCHEDULERS: Tuple[str, ...] = ("pipeline", "batch")
+
+
+async def async_batch(self, methods: Sequence[str], desc: str) -> Throughput:
+    start: float = time.perf_counter()
+    items: int = 0
     for idx in tqdm(range(0, len(self.dates), self.batch_size), desc=desc):
         for method in methods:
             await asyncio.gather(
@@ -222,10 +262,154 @@ async def async_batch(self, methods: Sequence[str], desc: str) -> None:
                     for idx in range(idx, self.batch_size + idx)
                 ]
             )
+        items += len(self.urls[idx : idx + self.batch_size])
+    throughput = Throughput(items, time.perf_counter() - start)
+    print(f"{desc} (batch): {throughput}")
+    return throughput
+
+
+async def async_pipeline(self, desc: str) -> Throughput:
+    """
+    Sliding-window scheduler: keeps self.batch_size downloads in flight and
+    hands every item to the preprocessing stage as soon as its download ends,
+    with at most self.batch_size items preprocessing at once.
+    Connection failures are deferred to a retry queue with their next-eligible
+    time instead of sleeping inside a worker slot, items that exhaust their
+    retries are reported in the returned Throughput.
+    """
+    loop = asyncio.get_running_loop()
+    workers: int = max(1, self.batch_size)
+    queue: asyncio.Queue = asyncio.Queue()
+    # At most as many downloaded items wait for or run preprocessing as downloads
+    prep_slots = asyncio.Semaphore(workers)
+    progress = tqdm(total=0, desc=desc)
+    preps: List[asyncio.Task] = []
+    attempts: Dict[int, int] = {}
+    failed: List[str] = []
+    enqueued: int = 0
+    undelivered: int = 0
+    outstanding: int = 0
+    scrapped: bool = False
+    start: float = time.perf_counter()
+
+    def schedule() -> None:
+        nonlocal enqueued, outstanding
+        while enqueued < len(self.urls):
+            queue.put_nowait(enqueued)
+            enqueued += 1
+            outstanding += 1
+        progress.total = enqueued
+        progress.refresh()
+
+    def finish() -> None:
+        nonlocal outstanding
+        outstanding -= 1
+        close()
+
+    def close() -> None:
+        if scrapped and not outstanding:
+            for _ in range(workers):
+                queue.put_nowait(None)
+
+    def give_up(url: str, error: RetryLater) -> None:
+        print(f"{desc}: giving up on {url} after {error.max_retries} attempts")
+        record(self, "failure", url, failed=True, error=error.error.__class__.__name__)
+        failed.append(url)
+
+    def retry(url: str, error: RetryLater) -> None:
+        record(self, "retry", url, error=error.error.__class__.__name__)
+
+    async def scrap(idx: int, semaphore: asyncio.Semaphore) -> None:
+        for attempt in count():
+            ATTEMPT.set(attempt)
+            try:
+                async with semaphore:
+                    await self._scrap(idx)
+                break
+            except RetryLater as e:
+                scrap_urls = getattr(self, "scrap_urls", None)
+                url: str = scrap_urls[idx] if scrap_urls else self.dates[idx].str()
+                if attempt + 1 >= e.max_retries:
+                    give_up(url, e)
+                    break
+                retry(url, e)
+                await asyncio.sleep(e.retry_in)
+        schedule()
+
+    async def scrapper() -> None:
+        nonlocal scrapped
+        semaphore = asyncio.Semaphore(workers)
+        await asyncio.gather(*[scrap(idx, semaphore) for idx in range(len(self.dates))])
+        schedule()
+        scrapped = True
+        close()
+
+    async def downloader() -> None:
+        nonlocal undelivered
+        while (idx := await queue.get()) is not None:
+            record(self, "queue", depth=queue.qsize())
+            ATTEMPT.set(attempts.get(idx, 0))
+            try:
+                await self._download(idx)
+            except RetryLater as e:
+                attempts[idx] = attempts.get(idx, 0) + 1
+                if attempts[idx] < e.max_retries:
+                    retry(self.urls[idx], e)
+                    loop.call_later(e.retry_in, queue.put_nowait, idx)
+                    continue
+                give_up(self.urls[idx], e)
+                undelivered += 1
+                progress.update(1)
+                finish()
+                continue
+            await prep_slots.acquire()
+            preps.append(asyncio.ensure_future(prep(idx)))
+            finish()
+
+    async def prep(idx: int) -> None:
+        try:
+            await self._preprocess(idx)
+        finally:
+            prep_slots.release()
+        progress.update(1)
+
+    token = DEFERRED.set(True)
+    tasks: List[asyncio.Task] = [asyncio.ensure_future(scrapper())] + [
+        asyncio.ensure_future(downloader()) for _ in range(workers)
+    ]
+    try:
+        await asyncio.gather(*tasks)
+        await asyncio.gather(*preps)
+    finally:
+        DEFERRED.reset(token)
+        for task in tasks + preps:
+            task.cancel()
+        progress.close()
+
+    throughput = Throughput(enqueued - undelivered, time.perf_counter() - start, failed)
+    print(f"{desc} (pipeline): {throughput}")
+    for url in failed:
+        print(f"{desc}: never succeeded: {url}")
+    return throughput
 
 
 # Utilities for downloading
 ## Decorator for connection error
+
+# Set by the pipeline scheduler: failures are raised as RetryLater instead of
+# sleeping in place, ATTEMPT carries how many times the item already failed.
+DEFERRED: ContextVar[bool] = ContextVar("DEFERRED", default=False)
+ATTEMPT: ContextVar[int] = ContextVar("ATTEMPT", default=0)
+
+
+class RetryLater(Exception):
+    def __init__(self, error: Exception, retry_in: float, max_retries: int) -> None:
+        super().__init__(f"{error}, eligible again in {retry_in} seconds")
+        self.error = error
+        self.retry_in = retry_in
+        self.max_retries = max_retries
+
+
 def handle_client_connection_error(
     default_cooldown: int, max_retries: int = 100, increment="linear"
 ) -> Callable:
@@ -243,8 +427,22 @@ def handle_client_connection_error(
             while retries < max_retries:
                 try:
                     return await func(*args, **kwargs)
-                except (ClientConnectionError, asyncio.TimeoutError) as e:
+                except RateLimited as e:
+                    if DEFERRED.get():
+                        raise RetryLater(e, e.retry_after or 0, max_retries) from e
+                    print(f"{e}, retrying once the host limiter allows it..")
+                    record(args[0], "retry", e.url, error=e.__class__.__name__)
+                    retries += 1
+                except (
+                    ClientConnectionError,
+                    ClientPayloadError,
+                    asyncio.TimeoutError,
+                ) as e:
+                    if DEFERRED.get():
+                        retry_in = VALID_HANDLE[increment](ATTEMPT.get())
+                        raise RetryLater(e, retry_in, max_retries) from e
                     retry_in = VALID_HANDLE[increment](retries)
+                    record(args[0], "retry", error=e.__class__.__name__)
                     print(f"Attempt {retries} failed.")
                     print(
                         f"Connection error encountered: {e}, retrying in {retry_in} seconds.."
@@ -252,6 +450,7 @@ def handle_client_connection_error(
                     await asyncio.sleep(retry_in)
                     retries += 1
             print(f"Max retries ({max_retries}) reached. Operation failed.")
+            record(args[0], "failure", failed=True)
             raise ClientConnectionError("Max retries exceeded.")
 
         return wrapper
@@ -259,40 +458,153 @@ def handle_client_connection_error(
     return decorator
 
 
-def not_valid_query(self, url: str) -> None:
+MISSING_STATUS: Tuple[int, ...] = (404, 410)
+
+
+def not_valid_query(self, url: str, missing: bool = True) -> None:
+    """
+    Reports url as not available, when the archive answered that it does not
+    exist (missing) it is recorded in the journal so later fetches skip it
+    until the satellite's TTL for that url expires.
+    """
     print(f"{self.__class__.__name__}: Data not available for queried url {url}")
+    if missing and getattr(self, "journal", None) is not None:
+        self.journal.mark_missing(url, self._missing_ttl(url).total_seconds())
 
 
-async def check_response_bytes(self, response, url: str) -> Any:
-    if response is not None:
-        content = await response.read()
-        if (
-            response.status != 200
-            or content.startswith(b"<html>")
-            or b"404 Not Found" in content
-        ):
-            not_valid_query(self, url)
-            return
-        return content
+def known_missing(self, url: str) -> bool:
+    journal = getattr(self, "journal", None)
+    return journal is not None and journal.known_missing(url)
+
+
+def check_response_headers(self, response, url: str) -> bool:
+    if response is None:
+        return False
+    content_type: str = response.headers.get("Content-Type", "")
+    if response.status not in (200, 206) or content_type.startswith("text/html"):
+        not_valid_query(self, url, response.status in MISSING_STATUS)
+        return False
+    return True
 
 
 async def check_response_text(self, response, url: str) -> Any:
     if response is not None:
         content = await response.text()
         if response.status != 200 or "404 Not Found" in content:
-            not_valid_query(self, url)
+            not_valid_query(
+                self,
+                url,
+                response.status in MISSING_STATUS or "404 Not Found" in content,
+            )
         return content
 
 
+DOWNLOAD_CHUNK_SIZE: int = 1 << 20
+
+
+def part_path(path: str) -> str:
+    return path + ".part"
+
+
+def content_range(response) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Parses the Content-Range header: "bytes start-end/total" or "bytes */total".
+    """
+    value: str = response.headers.get("Content-Range", "")
+    try:
+        span, total = value.split(" ", 1)[-1].split("/")
+        start: Optional[int] = None if span == "*" else int(span.split("-")[0])
+        return start, None if total == "*" else int(total)
+    except ValueError:
+        return None, None
+
+
+async def stream_response(
+    response, path: str, mode: str = "wb", chunk_size: int = DOWNLOAD_CHUNK_SIZE
+) -> int:
+    """
+    Writes the response body to path in fixed-size chunks, returns the bytes written.
+    """
+    size: int = 0
+    async with aiofiles.open(path, mode) as f:
+        async for chunk in response.content.iter_chunked(chunk_size):
+            await f.write(chunk)
+            size += len(chunk)
+    return size
+
+
+async def fetch_part(self, url: str, path: str) -> bool:
+    """
+    Downloads url into the .part file of path. An existing .part file left by
+    an interrupted transfer is resumed with an HTTP Range request, the whole
+    file is fetched again when the server does not honour ranges.
+    Returns whether the .part file holds the complete payload.
+    """
+    if known_missing(self, url):
+        return False
+    part: str = part_path(path)
+    offset: int = osp.getsize(part) if osp.exists(part) else 0
+    headers: Dict[str, str] = {"Range": f"bytes={offset}-"} if offset else {}
+    with timed(self, "transfer", url) as event:
+        async with self.session.get(url, ssl=False, headers=headers) as response:
+            event["status"] = response.status
+            if response.status == 416 and offset:
+                if content_range(response)[-1] == offset:
+                    return True
+                os.remove(part)
+                return await fetch_part(self, url, path)
+            if not check_response_headers(self, response, url):
+                return False
+            if response.status != 206:
+                event["bytes"] = await stream_response(response, part, "wb")
+            elif content_range(response)[0] == offset:
+                event["bytes"] = await stream_response(response, part, "ab")
+            elif offset:
+                # A range other than the one asked for, start over without Range
+                os.remove(part)
+                return await fetch_part(self, url, path)
+            else:
+                return False
+    return True
+
+
+async def download_file(self, url: str, path: str) -> bool:
+    """
+    Resumable download of url, the file only appears at path once complete.
+    Goes through the session's raw cache when there is one.
+    """
+    cache = getattr(self, "cache", None)
+    if cache is not None:
+        raw: Optional[str] = await cache.get(self, url)
+        if raw is None:
+            return False
+        cache.link(url, raw, path)
+        return True
+    if await fetch_part(self, url, path):
+        os.replace(part_path(path), path)
+        return True
+    return False
+
+
+async def head_size(self, url: str) -> Optional[int]:
+    """
+    Content-Length of url from a HEAD request, None when the archive does not tell.
+    """
+    if known_missing(self, url):
+        return None
+    try:
+        async with self.session.head(url, ssl=False, allow_redirects=True) as response:
+            if response.status == 200:
+                return response.content_length
+    except (ClientError, asyncio.TimeoutError):
+        pass
+    return None
+
+
 @handle_client_connection_error(default_cooldown=5, increment="exp", max_retries=5)
 async def download_url_write(self, idx: int) -> None:
     try:
-        url: str = self.urls[idx]
-        async with self.session.get(url, ssl=False) as response:
-            content = await check_response_bytes(self, response, url)
-            if content is not None:
-                async with aiofiles.open(self.paths[idx], "wb") as f:
-                    await f.write(content)
+        await download_file(self, self.urls[idx], self.paths[idx])
     except IndexError:
         return
 
@@ -303,12 +615,25 @@ async def download_url_prep(
 ) -> Any:
     try:
         url: str = self.urls[idx]
-        async with self.session.get(url, ssl=False) as response:
-            content = await check_response_bytes(self, response, url)
-            if content is not None:
-                return await coroutine_handler(method, BytesIO(content), *args)
+        path: str = part_path(self.paths[idx])
     except IndexError:
         return
+    cache = getattr(self, "cache", None)
+    if cache is not None:
+        raw: Optional[str] = await cache.get(self, url)
+        if raw is None:
+            return
+        try:
+            return await coroutine_handler(method, raw, *args)
+        finally:
+            cache.release(url)
+    if not await fetch_part(self, url, self.paths[idx]):
+        return
+    try:
+        return await coroutine_handler(method, path, *args)
+    finally:
+        if osp.exists(path):
+            os.remove(path)
 
 
 @handle_client_connection_error(default_cooldown=5, increment="exp", max_retries=5)
@@ -317,6 +642,8 @@ async def scrap_url_default(
 ) -> Any:
     try:
         url: str = self.scrap_urls[idx]
+        if known_missing(self, url):
+            return
         async with self.session.get(url, ssl=False) as response:
             content = await check_response_text(self, response, url)
             if content is not None:
@@ -326,9 +653,9 @@ async def scrap_url_default(
 
 
 def find_files_glob(self, date: str) -> Tuple[bool, List[str]]:
-    out = glob(self.scrap_path(date))
+    out = self._files().glob(self.scrap_path(date))
     return bool(len(out)), out
 
 
 def find_files_daily(self, date: str) -> bool:
-    return osp.exists(self.scrap_path(date))
+    return self._files().exists(self.scrap_path(date))
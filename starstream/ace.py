@@ -71,9 +71,13 @@ def SWEPAM_version(date, mode="%Y%m%d"):
 class ACE:
     class SIS(CDAWeb):
         def __init__(
-            self, download_path: str = "./data/ACE/SIS/", batch_size: int = 10
+            self,
+            download_path: str = "./data/ACE/SIS/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(download_path, batch_size)
+            super().__init__(download_path, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "flux_He",
                 "flux_C",
@@ -99,9 +103,13 @@ class ACE:
 
     class MAG(CDAWeb):
         def __init__(
-            self, download_path: str = "./data/ACE/MAG/", batch_size: int = 10
+            self,
+            download_path: str = "./data/ACE/MAG/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(download_path, batch_size)
+            super().__init__(download_path, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "Magnitude",
                 "BGSM",
@@ -132,9 +140,13 @@ class ACE:
 
     class SWEPAM(CDAWeb):
         def __init__(
-            self, download_path: str = "./data/ACE/SWEPAM", batch_size: int = 10
+            self,
+            download_path: str = "./data/ACE/SWEPAM",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(download_path, batch_size)
+            super().__init__(download_path, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "Np",
                 "Vp",
@@ -157,9 +169,13 @@ class ACE:
 
     class SWICS(CDAWeb):
         def __init__(
-            self, download_path: str = "./data/ACE/SWICS/", batch_size: int = 10
+            self,
+            download_path: str = "./data/ACE/SWICS/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(download_path, batch_size)
+            super().__init__(download_path, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = ["nH", "vH", "vthH"]  # variables#change
             self.variables: List[str] = self.phy_obs
             self.url: Callable[[str], str] = (
@@ -168,9 +184,13 @@ class ACE:
 
     class EPAM(CDAWeb):
         def __init__(
-            self, download_path: str = "./data/ACE/EPAM/", batch_size: int = 10
+            self,
+            download_path: str = "./data/ACE/EPAM/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(download_path, batch_size)
+            super().__init__(download_path, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "DE1",
                 "DE4",
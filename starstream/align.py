@@ -0,0 +1,120 @@
+from starstream._base import CSV
+from starstream._executor import thread_pool
+from starstream._resample import Agg
+from starstream._utils import create_scrap_date
+from starstream.typing import ScrapDate
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import polars as pl
+import torch
+
+__all__ = ["align"]
+
+OUTPUTS: Tuple[str, ...] = ("polars", "numpy", "torch", "pandas")
+
+
+def prefixes(sat_objs: Sequence[CSV]) -> List[str]:
+    """
+    ACE_MAG_, ACE_SWEPAM_, ... numbered when a class appears more than once.
+    """
+    names: List[str] = [
+        obj.__class__.__qualname__.replace(".", "_") for obj in sat_objs
+    ]
+    return [
+        f"{name}_" if names.count(name) == 1 else f"{name}{names[:i].count(name)}_"
+        for i, name in enumerate(names)
+    ]
+
+
+def grid(interval: Tuple[datetime, datetime], resolution: timedelta) -> pl.DataFrame:
+    start: datetime = pl.select(pl.lit(interval[0]).dt.truncate(resolution)).item()
+    return pl.DataFrame(
+        {
+            "date": pl.datetime_range(
+                start, interval[-1], resolution, closed="left", eager=True
+            )
+        }
+    ).cast({"date": pl.Datetime("us")})
+
+
+def join(
+    frame: pl.DataFrame,
+    source: pl.DataFrame,
+    prefix: str,
+    tolerance: Optional[timedelta],
+) -> pl.DataFrame:
+    source = source.cast({"date": pl.Datetime("us")}).rename(
+        {name: prefix + name for name in source.columns if name != "date"}
+    )
+    if tolerance is None:
+        return frame.join(source, on="date", how="left")
+    return frame.join_asof(
+        source.sort("date"), on="date", strategy="backward", tolerance=tolerance
+    )
+
+
+def align(
+    sat_objs: Sequence[CSV],
+    scrap_date: ScrapDate,
+    resolution: timedelta,
+    tolerance: Optional[timedelta] = None,
+    output: str = "polars",
+    agg: Agg = "mean",
+    columns: Optional[Dict[int, List[str]]] = None,
+) -> Any:
+    """
+    Puts several CSV sources on one time grid of resolution.
+
+    Every source is read and resampled to resolution in parallel on the
+    shared thread pool with its lazy query engine, then joined to the grid:
+    on the exact window when tolerance is None, otherwise to the last value
+    no older than tolerance.
+    Columns are prefixed by their source (ACE_MAG_Bnorm, Dst_dst_index, ...).
+
+    Args:
+    sat_objs (Sequence[CSV]): Sources to align.
+    scrap_date (ScrapDate): Interval(s), their grids are concatenated.
+    resolution (timedelta): Step of the grid.
+    tolerance (Optional[timedelta]): As-of join tolerance.
+    output (str): polars (with date), pandas (date index), numpy or torch.
+    agg (Agg): Aggregations of the resampling, see CSV.get_polars.
+    columns (Optional[Dict[int, List[str]]]): Columns to read by source index.
+
+    Returns:
+    The aligned data in the output format.
+    """
+    assert output in OUTPUTS, f"Not valid output, must be {OUTPUTS}"
+    assert all(
+        isinstance(obj, CSV) for obj in sat_objs
+    ), "Not valid source, must be a CSV satellite"
+    scrap_date = create_scrap_date(scrap_date)
+    columns = columns or {}
+
+    def read(idx: int) -> List[pl.DataFrame]:
+        return sat_objs[idx]._process_polars(
+            scrap_date, resolution, agg, columns.get(idx)
+        )
+
+    sources: List[List[pl.DataFrame]] = list(
+        thread_pool().map(read, range(len(sat_objs)))
+    )
+
+    frames: List[pl.DataFrame] = []
+    for i, interval in enumerate(scrap_date):
+        frame: pl.DataFrame = grid(interval, resolution)
+        for prefix, obj, frames_of in zip(prefixes(sat_objs), sat_objs, sources):
+            if len(frames_of) <= i:
+                raise ValueError(f"No local data of {obj.__class__.__qualname__}")
+            frame = join(frame, frames_of[i], prefix, tolerance)
+        frames.append(frame)
+    out: pl.DataFrame = pl.concat(frames)
+
+    match output:
+        case "polars":
+            return out
+        case "pandas":
+            return out.to_pandas(date_as_object=False).set_index("date", drop=True)
+        case "numpy":
+            return out.drop("date").to_numpy()
+        case "torch":
+            return torch.from_numpy(out.drop("date").to_numpy().astype("float32"))
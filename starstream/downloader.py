@@ -1,24 +1,109 @@
-from typing import List, Union, Tuple
+from typing import List, Optional, Union, Tuple
 from datetime import datetime
-from ._base import Satellite
+from ._base import Plan, Satellite
+from ._executor import set_prep_workers, shutdown_prep_workers
+from ._cache import RawCache
+from ._metrics import Metrics
+from ._session import ConnectionPool, PooledSession
 import asyncio
-import aiohttp
+import os.path as osp
 
 
 def DataDownloading(
     sat_objs: Union[List, Satellite],
     scrap_date: Union[List[Tuple[datetime, datetime]], Tuple[datetime, datetime]],
+    scheduler: str = "pipeline",
+    pool: Optional[ConnectionPool] = None,
+    journal: bool = True,
+    prep_workers: Optional[int] = None,
+    metrics: Union[Metrics, str, None] = None,
+    plans: Optional[List[Optional[Plan]]] = None,
+    cache: Union[RawCache, bool] = False,
 ) -> None:
     if not isinstance(sat_objs, list):
         sat_objs = [sat_objs]
-    asyncio.run(downloader(sat_objs, scrap_date))
+    asyncio.run(
+        downloader(
+            sat_objs,
+            scrap_date,
+            scheduler,
+            pool,
+            journal,
+            prep_workers,
+            metrics,
+            plans,
+            cache,
+        )
+    )
+
+
+def DataPlanning(
+    sat_objs: Union[List, Satellite],
+    scrap_date: Union[List[Tuple[datetime, datetime]], Tuple[datetime, datetime]],
+    pool: Optional[ConnectionPool] = None,
+    sizes: bool = True,
+    journal: bool = True,
+) -> List[Plan]:
+    """
+    Dry run of DataDownloading: discovers what each satellite would download,
+    the plans can be passed back to DataDownloading to execute them.
+    """
+    if not isinstance(sat_objs, list):
+        sat_objs = [sat_objs]
+    return asyncio.run(planner(sat_objs, scrap_date, pool, sizes, journal))
+
+
+async def planner(
+    sat_objs: List[Satellite],
+    scrap_date: Union[List[Tuple[datetime, datetime]], Tuple[datetime, datetime]],
+    pool: Optional[ConnectionPool] = None,
+    sizes: bool = True,
+    journal: bool = True,
+) -> List[Plan]:
+    async with PooledSession(pool) as session:
+        return list(
+            await asyncio.gather(
+                *[
+                    satellite.plan(scrap_date, session, sizes, journal)
+                    for satellite in sat_objs
+                ]
+            )
+        )
 
 
 async def downloader(
     sat_objs: List[Satellite],
     scrap_date: Union[List[Tuple[datetime, datetime]], Tuple[datetime, datetime]],
+    scheduler: str = "pipeline",
+    pool: Optional[ConnectionPool] = None,
+    journal: bool = True,
+    prep_workers: Optional[int] = None,
+    metrics: Union[Metrics, str, None] = None,
+    plans: Optional[List[Optional[Plan]]] = None,
+    cache: Union[RawCache, bool] = False,
 ) -> None:
-    async with aiohttp.ClientSession() as session:
-        await asyncio.gather(
-            *[satellite.fetch(scrap_date, session) for satellite in sat_objs]
-        )
+    if plans is None:
+        plans = [None] * len(sat_objs)
+    assert len(plans) == len(sat_objs), "Not valid plans, must be one per satellite"
+    registry: Optional[Metrics] = (
+        Metrics(metrics) if isinstance(metrics, str) else metrics
+    )
+    if cache is True:
+        cache = RawCache(osp.join(sat_objs[0].root, ".raw"))
+    if prep_workers is not None:
+        set_prep_workers(prep_workers)
+    try:
+        async with PooledSession(pool, registry, cache or None) as session:
+            await asyncio.gather(
+                *[
+                    satellite.fetch(
+                        scrap_date, session, scheduler, journal, registry, plan
+                    )
+                    for satellite, plan in zip(sat_objs, plans)
+                ]
+            )
+    finally:
+        if prep_workers is not None:
+            shutdown_prep_workers()
+        if isinstance(metrics, str) and registry is not None:
+            registry.close()
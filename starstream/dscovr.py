@@ -1,7 +1,8 @@
 from tqdm import tqdm
 from starstream._base import CSV
+from starstream._executor import run_cpu
+from starstream._storage import write_table
 from starstream._utils import (
-    asyncGZIP,
     create_scrap_date,
     download_url_prep,
     handle_client_connection_error,
@@ -9,6 +10,8 @@ from starstream._utils import (
 from starstream.typing import ScrapDate
 from datetime import timedelta, datetime
 import xarray as xr
+import polars as pl
+import gzip
 import os
 import time
 from typing import Optional, Tuple, List, Union, Callable
@@ -21,6 +24,16 @@ from dateutil.relativedelta import relativedelta
 __all__ = ["DSCOVR"]
 
 
+def gz_processing(path: str, csv_path: str) -> None:
+    with gzip.open(path) as gz_file:
+        dataset = xr.open_dataset(gz_file.read())
+    df = dataset.to_dataframe()
+    dataset.close()
+    df = df.reset_index(drop=False)
+    df = df.rename(columns={"time": "date"})
+    write_table(pl.from_pandas(df), csv_path)
+
+
 class DSCOVR:
     class __Base(CSV):
         def __init__(
@@ -32,8 +45,12 @@ class DSCOVR:
             format: str = "%Y%m%d",
             level: str = "l2",
             achronym: Optional[str] = None,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size, filepath, date_sampling, format)
+            super().__init__(
+                root, batch_size, filepath, date_sampling, format, storage, layout
+            )
             assert level == "l2" or level == "l1", "Not valid data product level"
             assert achronym is not None, "Achronym not passed"
             self.level = level
@@ -47,9 +64,11 @@ class DSCOVR:
             for url in tqdm(
                 lines, desc=f"{self.__class__.__name__}: Getting the URLs..."
             ):
-                for date in self.dates:
+                for idx, date in enumerate(self.dates):
                     if date.str() + "000000" in url and self.achronym in url:
-                        self.urls.append(url[:-1])
+                        self._targets(
+                            idx, [url.rstrip("\n")], [self.filepath(date.str())]
+                        )
 
         async def _check_update(
             self, scrap_date: List[Tuple[datetime, datetime]]
@@ -87,7 +106,6 @@ class DSCOVR:
             await self._check_update(create_scrap_date(scrap_date))
             super()._interval_setup(scrap_date)
             await self._get_urls()
-            self.paths = [self.filepath(date.str()) for date in self.dates]
 
         async def _scrap_(self, idx: int) -> None:
             _ = idx
@@ -124,22 +142,14 @@ class DSCOVR:
             async with aiofiles.open(update_path, "w") as file:
                 await file.write(scrap_date[-1].strftime("%Y%m%d"))
 
-        def _gz_processing(self, gz_file, date: str) -> None:
-            dataset = xr.open_dataset(gz_file.read())
-            df = dataset.to_dataframe()
-            dataset.close()
-            df = df.reset_index(drop=False)
-            df = df.rename(columns={"time": "date"})
-            df.to_csv(self.filepath(date), index=False)
+        async def _gz_processing(self, path: str, csv_path: str) -> None:
+            await run_cpu(gz_processing, path, csv_path)
 
         @handle_client_connection_error(
             default_cooldown=5, max_retries=3, increment="exp"
         )
         async def _download_(self, idx: int) -> None:
-            async def anonymous(gzip_file):
-                await asyncGZIP(gzip_file, self._gz_processing, self.dates[idx].str())
-
-            await download_url_prep(self, idx, anonymous)
+            await download_url_prep(self, idx, self._gz_processing, self.paths[idx])
 
         async def _prep_(self, idx: int) -> None:
             _ = idx
@@ -150,12 +160,16 @@ class DSCOVR:
             root: str = "./data/DSCOVR/FaradayCup",
             batch_size: int = 15,
             level: str = "l2",
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
             super().__init__(
                 root=osp.join(root, level),
                 batch_size=batch_size,
                 level=level,
                 achronym="fc1" if level == "l1" else "f1m",
+                storage=storage,
+                layout=layout,
             )
 
     class Magnetometer(__Base):
@@ -164,10 +178,14 @@ class DSCOVR:
             root: str = "./data/DSCOVR/Magnetometer",
             batch_size: int = 10,
             level: str = "l2",
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
             super().__init__(
                 root=osp.join(root, level),
                 batch_size=batch_size,
                 level=level,
                 achronym="mg1" if level == "l1" else "m1m",
+                storage=storage,
+                layout=layout,
             )
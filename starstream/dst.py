@@ -1,4 +1,5 @@
 from starstream._base import CSV
+from starstream._storage import read_table, write_table
 from starstream._utils import (
     download_url_prep,
     StarDate,
@@ -20,10 +21,18 @@ def last_december() -> datetime:
 
 
 class Dst(CSV):
-    def __init__(self, root: str = "./data/Dst", batch_size: int = 10) -> None:
+    def __init__(
+        self,
+        root: str = "./data/Dst",
+        batch_size: int = 10,
+        storage: str = "csv",
+        layout: str = "flat",
+    ) -> None:
         super().__init__(
             root=root,
             batch_size=batch_size,
+            storage=storage,
+            layout=layout,
             date_sampling=relativedelta(months=1),
             format="%Y%m",
         )
@@ -41,10 +50,23 @@ class Dst(CSV):
         else:
             return f"https://wdc.kugi.kyoto-u.ac.jp/dst_final/{month}/dst{month[2:]}.for.request"
 
+    def _missing_ttl(self, url: str) -> timedelta:
+        """
+        Realtime and provisional months are published as the year goes on,
+        only the final product keeps the archival TTL.
+        """
+        if "/dst_realtime/" in url:
+            return timedelta(hours=1)
+        if "/dst_provisional/" in url:
+            return timedelta(days=1)
+        return super()._missing_ttl(url)
+
     def _interval_setup(self, scrap_date: ScrapDate) -> None:
         super()._interval_setup(scrap_date)
-        self.urls = [self._date_to_url(month.str()) for month in self.dates]
-        self.paths = [self.filepath(month.str()) for month in self.dates]
+        for idx, month in enumerate(self.dates):
+            self._targets(
+                idx, [self._date_to_url(month.str())], [self.filepath(month.str())]
+            )
 
     async def _scrap_(self, idx: int) -> None:
         _ = idx
@@ -56,21 +78,19 @@ class Dst(CSV):
     async def _prep_(self, idx: int) -> None:
         _ = idx
 
-    async def _on_download_prep(self, data, idx: int) -> None:
+    async def _on_download_prep(self, path: str, idx: int) -> None:
         date: StarDate = self.dates[idx]
-        data = data.read().decode("utf-8").split("\n")
+        async with aiofiles.open(path, "r", encoding="utf-8") as f:
+            data = (await f.read()).split("\n")
         data = list(map(lambda x: x.replace("-", " -").replace("+", " +"), data))
         data = list(map(lambda x: x.split(), data))
         value: List = list(
             map(float, chain.from_iterable([sample[3:-1] for sample in data[:-3]]))
         )
-        value.insert(0, "dst_index")
-        value = "\n".join(list(map(lambda x: str(x) + ",", value)))
-        async with aiofiles.open(self.filepath(date.str()), "w") as f:
-            await f.write(value)
+        write_table(pl.DataFrame({"dst_index": value}), self.filepath(date.str()))
 
     def _get_df_unit(self, date: str) -> pl.DataFrame:
-        df = pl.read_csv(self.filepath(date)).get_column("dst_index")
+        df = read_table(self.filepath(date), ["dst_index"]).get_column("dst_index")
         start_date: datetime = datetime(int(date[:4]), int(date[4:6]), 1)
         end_date: datetime = start_date + relativedelta(months=1) - timedelta(hours=1)
         full_range = pl.DataFrame(
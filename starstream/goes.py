@@ -5,12 +5,13 @@ from starstream._utils import (
     handle_client_connection_error,
     scrap_url_default,
 )
-from typing import Callable, List, Tuple, Union
+from typing import Callable, List, Optional, Tuple, Union
 from starstream.typing import ScrapDate
 from starstream._base import Img
 from bs4 import BeautifulSoup
 import aiofiles
 import os
+import re
 from datetime import datetime
 
 VALID_INSTRUMENTS = ["fe094", "fe131", "fe171", "fe195", "fe284", "he304"]
@@ -20,6 +21,17 @@ def to_doy_year(date: str) -> str:
     return date[:4] + datetime.strptime(date, "%Y%m%d").strftime("%j")
 
 
+START = re.compile(r"_s(\d{7})")
+
+
+def suvi_day(name: str) -> Optional[str]:
+    """
+    Year and day of year of the observation start (_sYYYYDDD...) of a SUVI file.
+    """
+    match = START.search(name)
+    return None if match is None else match.group(1)
+
+
 class GOES16(Img):
     def __init__(
         self,
@@ -44,16 +56,9 @@ class GOES16(Img):
         self.granularity: float = granularity
 
     def _find_local(self, date: StarDate) -> Tuple[bool, Union[List[str], None]]:
-        try:
-            files: List[str] = os.listdir(self.root)
-            filepaths: List[str] = list(
-                map(
-                    self.filepath, filter(lambda y: to_doy_year(date.str()) in y, files)
-                )
-            )
-            return bool(len(filepaths)), filepaths
-        except FileNotFoundError:
-            return False, None
+        index = self._files().index(self.root, suvi_day)
+        filepaths: List[str] = index.get(to_doy_year(date.str()), [])
+        return bool(len(filepaths)), filepaths
 
     def _interval_setup(self, scrap_date: ScrapDate) -> None:
         super()._interval_setup(scrap_date)
@@ -63,10 +68,13 @@ class GOES16(Img):
     async def _scrap_(self, idx: int) -> None:
         try:
             date: StarDate = self.dates[idx]
-            names: List[str] = await scrap_url_default(self, idx, self.manipulate_html)
-            self.urls.extend(list(map(lambda y: self.url(y, date.str()), names)))
-            self.paths.extend(
-                list(map(lambda y: self.filepath(y)[:-8] + ".fits", names))
+            names: List[str] = (
+                await scrap_url_default(self, idx, self.manipulate_html) or []
+            )
+            self._targets(
+                idx,
+                [self.url(name, date.str()) for name in names],
+                [self.filepath(name)[:-8] + ".fits" for name in names],
             )
         except IndexError:
             return
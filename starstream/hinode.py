@@ -7,7 +7,6 @@ from starstream._utils import (
 )
 from datetime import timedelta
 from bs4 import BeautifulSoup
-import glob
 import os.path as osp
 
 from starstream.typing import ScrapDate
@@ -33,7 +32,7 @@ class Hinode:
 
         def _find_local(self, date: StarDate) -> Tuple[bool, List[str]]:
             query_c = "*" + "_".join(date.str().split("-"))[:-4] + "**"
-            out = glob.glob(self.filepath(query_c))
+            out = self._files().glob(self.filepath(query_c))
             return bool(len(out)), out
 
         def _interval_setup(self, scrap_date: ScrapDate) -> None:
@@ -45,18 +44,21 @@ class Hinode:
         async def _scrap_(self, idx: int) -> None:
             try:
                 date: str = self.dates[idx].str()
-                await scrap_url_default(self, idx, self.scrap, *date.split("-"))
+                await scrap_url_default(self, idx, self.scrap, idx, *date.split("-"))
             except IndexError:
                 return
 
-        def scrap(self, html, date: str, hour: str) -> None:
+        def scrap(self, html, idx: int, date: str, hour: str) -> None:
             soup = BeautifulSoup(html, "html.parser")
             names = soup.find_all(
                 "a", href=lambda href: href and href.endswith(".fits")
             )
             names: List[str] = [name["href"] for name in names]
-            self.urls.extend([self.url(date, hour, name) for name in names])
-            self.paths.extend([self.filepath(name) for name in names])
+            self._targets(
+                idx,
+                [self.url(date, hour, name) for name in names],
+                [self.filepath(name) for name in names],
+            )
 
         async def _download_(self, idx: int) -> None:
             await download_url_write(self, idx)
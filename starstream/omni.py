@@ -5,10 +5,18 @@ __all__ = ["OMNI"]
 
 
 class OMNI(CDAWeb):
-    def __init__(self, root: str = "./data/OMNI/HRO2/", batch_size: int = 10) -> None:
+    def __init__(
+        self,
+        root: str = "./data/OMNI/HRO2/",
+        batch_size: int = 10,
+        storage: str = "csv",
+        layout: str = "flat",
+    ) -> None:
         super().__init__(
             root=root,
             batch_size=batch_size,
+            storage=storage,
+            layout=layout,
             format="%Y%m",
             date_sampling=relativedelta(months=1),
         )
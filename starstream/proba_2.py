@@ -1,13 +1,12 @@
 from typing import Callable
 from numpy._typing import NDArray
 from starstream._base import CSV
-from starstream._utils import (
-    asyncFITS,
-    download_url_prep,
-)
+from starstream._executor import run_cpu
+from starstream._storage import write_table
+from starstream._utils import download_url_prep
+from astropy.io import fits
 import numpy as np
 from datetime import datetime
-import os.path as osp
 import polars as pl
 from starstream.typing import ScrapDate
 
@@ -24,17 +23,28 @@ def min_to_datetime(data: NDArray, date: str) -> NDArray:
     return np.array([func(int(item.item())) for item in data])
 
 
+def lyra_processing(path: str, date: str, csv_path: str) -> None:
+    with fits.open(path) as hdul:
+        data = np.stack(hdul[1].data, axis=0)
+    df: pl.DataFrame = pl.from_numpy(
+        data[:, 1:-1].astype(np.float32),
+        schema=[f"channel_{i}" for i in range(1, 5)],
+    )
+    dates = pl.Series("date", min_to_datetime(data[:, 0], date).tolist())
+    write_table(df.insert_column(0, dates), csv_path)
+
+
 class PROBA_2:
     class LYRA(CSV):
         def __init__(
             self,
             root: str = "./data/LYRA",
             batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ):
             super().__init__(
-                root=root,
-                batch_size=batch_size,
-                filepath=lambda date: osp.join(root, f"{date}.csv"),
+                root=root, batch_size=batch_size, storage=storage, layout=layout
             )
             self.url: Callable[[str], str] = (
                 lambda date: f"http://proba2.oma.be/lyra/data/bsd/{date[:4]}/{date[4:6]}/{date[6:]}/lyra_{date}-000000_lev3_std.fits"
@@ -42,24 +52,18 @@ class PROBA_2:
 
         def _interval_setup(self, scrap_date: ScrapDate) -> None:
             super()._interval_setup(scrap_date)
-            self.urls = [self.url(date.str()) for date in self.dates]
-            self.paths = [self.filepath(date.str()) for date in self.dates]
+            for idx, date in enumerate(self.dates):
+                self._targets(idx, [self.url(date.str())], [self.filepath(date.str())])
 
         async def _scrap_(self, idx: int) -> None:
             _ = idx
 
         async def _download_(self, idx: int) -> None:
-            await download_url_prep(self, idx, asyncFITS, self.preprocess, idx)
+            await download_url_prep(self, idx, self.preprocess, idx)
 
         async def _prep_(self, idx: int) -> None:
             _ = idx
 
-        async def preprocess(self, hdul, idx: int) -> None:
+        async def preprocess(self, path: str, idx: int) -> None:
             date: str = self.dates[idx].str()
-            data = np.stack(hdul[1].data, axis=0)
-            data[:, 1:] = data[:, 1:].astype(np.float32)
-            data[:, 0] = min_to_datetime(data[:, 0], date)
-            pl.from_numpy(
-                data[:, :-1],
-                schema=["date"] + [f"channel_{i}" for i in range(1, 5)],
-            ).write_csv(self.filepath(date))
+            await run_cpu(lyra_processing, path, date, self.filepath(date))
@@ -1,6 +1,7 @@
 from starstream._base import CSV
+from starstream._executor import run_cpu, run_io
+from starstream._storage import write_table
 from starstream._utils import (
-    asyncFITS,
     datetime,
     download_url_prep,
     download_url_write,
@@ -10,7 +11,7 @@ from starstream.typing import ScrapDate
 from ._base import Img
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
-import asyncio
+from astropy.io import fits
 from typing import Callable, List
 import os.path as osp
 import polars as pl
@@ -72,6 +73,22 @@ class Base(Img):
         _ = idx
 
 
+def eve_processing(path: str, csv_path: str) -> None:
+    columns: List[str] = [
+        "MEGSB_LINE_IRRADIANCE",
+        "MEGSB_LINE_PRECISION",
+        "MEGSB_LINE_ACCURACY",
+        "MEGSB_LINE_STDEV",
+    ]
+    with fits.open(path) as hdul:
+        data = hdul[8].data
+        data = np.stack([data[column] for column in columns], axis=-1)
+    if data is not None:
+        data = data.astype(np.float32).squeeze(0)
+        df: pl.DataFrame = pl.from_numpy(data, schema=columns)
+        write_table(df, csv_path)
+
+
 class SDO:
     class AIA_HR(Base):
         valid_wavelengths: List[str] = [
@@ -123,16 +140,18 @@ class SDO:
 
         async def manipulate_html(self, html, idx: int):
             date: str = self.dates[idx].str()
-            loop = asyncio.get_event_loop()
-            soup = await loop.run_in_executor(None, BeautifulSoup, html, "html.parser")
-            scrap = await loop.run_in_executor(None, self.find_all, soup)
+            soup = await run_io(BeautifulSoup, html, "html.parser")
+            scrap = await run_io(self.find_all, soup)
             names = [name["href"] for name in scrap]
             names = [
                 names[i]
                 for i in range(0, len(names), self.resolution // self.min_step_size)
             ]
-            self.urls.extend([self.url(date, name) for name in names])
-            self.paths.extend([self.filepath(name) for name in names])
+            self._targets(
+                idx,
+                [self.url(date, name) for name in names],
+                [self.filepath(name) for name in names],
+            )
 
         def find_all(self, soup):
             return soup.find_all("a", href=lambda href: href.endswith(".jp2"))
@@ -183,22 +202,28 @@ class SDO:
 
         async def manipulate_html(self, html, idx: int) -> None:
             date: str = self.dates[idx].str()
-            loop = asyncio.get_event_loop()
-            soup = await loop.run_in_executor(None, BeautifulSoup, html, "html.parser")
-            scrap = await loop.run_in_executor(None, self.find_all, soup)
+            soup = await run_io(BeautifulSoup, html, "html.parser")
+            scrap = await run_io(self.find_all, soup)
             names = [name["href"] for name in scrap]
-            self.urls.extend([self.url(date, name) for name in names])
-            self.paths.extend([self.filepath(name) for name in names])
+            self._targets(
+                idx,
+                [self.url(date, name) for name in names],
+                [self.filepath(name) for name in names],
+            )
 
     class EVE(CSV):
         def __init__(
             self,
             root: str = "./data/SDO/EVE",
             batch_size: int = 1,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
             super().__init__(
                 root=root,
                 batch_size=batch_size,
+                storage=storage,
+                layout=layout,
             )
             self.url: Callable[[str], str] = (
                 lambda date: f"https://lasp.colorado.edu/eve/data_access/eve_data/products/level3/{date[:4]}/EVE_L3_{date_to_day_of_year(date)}_008_01.fit"
@@ -206,29 +231,17 @@ class SDO:
 
         def _interval_setup(self, scrap_date: ScrapDate) -> None:
             super()._interval_setup(scrap_date)
-            self.paths = [self.filepath(date.str()) for date in self.dates]
-            self.urls = [self.url(date.str()) for date in self.dates]
+            for idx, date in enumerate(self.dates):
+                self._targets(idx, [self.url(date.str())], [self.filepath(date.str())])
 
         async def _scrap_(self, idx: int) -> None:
             _ = idx
 
         async def _download_(self, idx: int) -> None:
-            await download_url_prep(self, idx, asyncFITS, self.preprocessing, idx)
+            await download_url_prep(self, idx, self.preprocessing, idx)
 
         async def _prep_(self, idx: int) -> None:
             _ = idx
 
-        def preprocessing(self, hdul, idx: int) -> None:
-            date: str = self.dates[idx].str()
-            data = hdul[8].data
-            columns: List[str] = [
-                "MEGSB_LINE_IRRADIANCE",
-                "MEGSB_LINE_PRECISION",
-                "MEGSB_LINE_ACCURACY",
-                "MEGSB_LINE_STDEV",
-            ]
-            data = np.stack([data[column] for column in columns], axis=-1)
-            if data is not None:
-                data = data.astype(np.float32).squeeze(0)
-                df: pl.DataFrame = pl.from_numpy(data, schema=columns)
-                df.write_csv(self.filepath(date))
+        async def preprocessing(self, path: str, idx: int) -> None:
+            await run_cpu(eve_processing, path, self.filepath(self.dates[idx].str()))
@@ -44,11 +44,11 @@ class STEREO_A:
             async def _scrap_(self, idx: int) -> None:
                 try:
                     date: str = self.dates[idx].str()
-                    await scrap_url_default(self, idx, self.scrap, date)
+                    await scrap_url_default(self, idx, self.scrap, idx, date)
                 except IndexError:
                     return
 
-            def scrap(self, html, date: str) -> None:
+            def scrap(self, html, idx: int, date: str) -> None:
                 soup = BeautifulSoup(html, "html.parser")
                 names = [
                     name["href"]
@@ -56,11 +56,11 @@ class STEREO_A:
                         "a", href=lambda key: key.endswith("R.png")
                     )
                 ]
-                self.paths.extend(
-                    [self.filepath(name) for name in names if name is not None]
-                )
-                self.urls.extend(
-                    [self.url(date, name) for name in names if name is not None]
+                names = [name for name in names if name is not None]
+                self._targets(
+                    idx,
+                    [self.url(date, name) for name in names],
+                    [self.filepath(name) for name in names],
                 )
 
             async def _download_(self, idx: int) -> None:
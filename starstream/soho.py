@@ -1,11 +1,15 @@
 from collections.abc import Callable
 from typing import List, Union
 from dateutil.relativedelta import relativedelta
-from starstream._utils import StarInterval, asyncTAR, handle_client_connection_error
+from starstream._utils import (
+    StarInterval,
+    asyncTAR,
+    download_file,
+    handle_client_connection_error,
+)
 from datetime import timedelta
 from starstream.typing import ScrapDate
 from ._base import CDAWeb, CSV
-from io import BytesIO
 import polars as pl
 import aiofiles
 import asyncio
@@ -19,9 +23,13 @@ __all__ = ["SOHO"]
 class SOHO:
     class CELIAS_SEM(CDAWeb):
         def __init__(
-            self, download_path: str = "./data/SOHO/CELIAS_SEM", batch_size: int = 10
+            self,
+            download_path: str = "./data/SOHO/CELIAS_SEM",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(download_path, batch_size)
+            super().__init__(download_path, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "CH1",
                 "CH2",
@@ -36,9 +44,13 @@ class SOHO:
 
     class CELIAS_PM(CDAWeb):
         def __init__(
-            self, download_path: str = "./data/SOHO/CELIAS_PM", batch_size: int = 10
+            self,
+            download_path: str = "./data/SOHO/CELIAS_PM",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(download_path, batch_size)
+            super().__init__(download_path, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "N_p",
                 "V_p",
@@ -53,9 +65,13 @@ class SOHO:
 
     class ERNE(CDAWeb):
         def __init__(
-            self, download_path: str = "./data/SOHO/ERNE/", batch_size: int = 10
+            self,
+            download_path: str = "./data/SOHO/ERNE/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(download_path, batch_size)
+            super().__init__(download_path, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "PH",
                 "PHC",
@@ -123,6 +139,7 @@ class SOHO:
                     date
                     for date in StarInterval(scrap_date, relativedelta(years=1), "%Y")
                 ]
+                self._targets(0, [self.url], [osp.join(self.root, self.name)])
 
             if self.dates:
                 os.makedirs(self.root, exist_ok=True)
@@ -135,10 +152,12 @@ class SOHO:
         )
         async def _download_(self, idx: int):
             _ = idx
-            async with self.session.get(self.url) as response:
-                if response.status == 200:
-                    data = await response.read()
-                    await asyncTAR(BytesIO(data), self.get_processing)
+            path: str = osp.join(self.root, self.name)
+            if not await download_file(self, self.url, path):
+                return
+            with open(path, "rb") as file:
+                await asyncTAR(file, self.get_processing)
+            os.remove(path)
             await asyncio.gather(*self.get_preprocessing_tasks())
 
         async def _prep_(self, idx: int) -> None:
@@ -29,8 +29,14 @@ def TDP_PM_version(date, mode="%Y%m%d"):
 
 class WIND:
     class MAG(CDAWeb):
-        def __init__(self, root: str = "./data/WIND/MAG", batch_size: int = 10) -> None:
-            super().__init__(root, batch_size)
+        def __init__(
+            self,
+            root: str = "./data/WIND/MAG",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
+        ) -> None:
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = ["BF1", "BGSE", "BGSM"]
             self.variables: List[str] = ["BF1"] + [
                 f"{name}_{i}" for name in self.phy_obs[1:3] for i in range(1, 4)
@@ -44,8 +50,10 @@ class WIND:
             self,
             root: str = "./data/WIND/SWE/alpha_proton",
             batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "Proton_V_nonlin",
                 "Proton_VX_nonlin",
@@ -85,8 +93,10 @@ class WIND:
             self,
             root: str = "./data/WIND/SWE/proton_anisotropy/",
             batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "Proton_V_nonlin",
                 "Proton_W_nonlin",
@@ -109,8 +119,10 @@ class WIND:
             self,
             root: str = "./data/WIND/SWE/electron_angle/",
             batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "f_pitch_SPA",
                 "Ve",
@@ -127,8 +139,10 @@ class WIND:
             self,
             root: str = "./data/WIND/SWE/electron_moments/",
             batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "N_elec",
                 "NcElec",
@@ -161,9 +175,13 @@ class WIND:
 
     class TDP_PM(CDAWeb):
         def __init__(
-            self, root: str = "./data/WIND/TDP/PM/", batch_size: int = 10
+            self,
+            root: str = "./data/WIND/TDP/PM/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "P_VELS",
                 "P_TEMP",
@@ -190,9 +208,13 @@ class WIND:
 
     class TDP_PLSP(CDAWeb):
         def __init__(
-            self, root: str = "./data/WIND/TDP/PLSP/", batch_size: int = 10
+            self,
+            root: str = "./data/WIND/TDP/PLSP/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "FLUX",
                 "ENERGY",
@@ -226,9 +248,13 @@ class WIND:
 
     class TDP_SOSP(CDAWeb):
         def __init__(
-            self, root: str = "./data/WIND/TDP/SOSP/", batch_size: int = 10
+            self,
+            root: str = "./data/WIND/TDP/SOSP/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "FLUX",
                 "ENERGY",
@@ -242,9 +268,13 @@ class WIND:
 
     class TDP_SOPD(CDAWeb):
         def __init__(
-            self, root: str = "./data/WIND/TDP/SOPD/", batch_size: int = 10
+            self,
+            root: str = "./data/WIND/TDP/SOPD/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "FLUX"  ## metadata: https://cdaweb.gsfc.nasa.gov/pub/software/cdawlib/0SKELTABLES/wi_h5_swe_00000000_v01.skt
             ]
@@ -271,9 +301,13 @@ class WIND:
 
     class TDP_ELSP(CDAWeb):
         def __init__(
-            self, root: str = "./data/WIND/TDP/ELSP/", batch_size: int = 10
+            self,
+            root: str = "./data/WIND/TDP/ELSP/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "FLUX",
                 "ENERGY",
@@ -306,9 +340,13 @@ class WIND:
 
     class TDP_ELPD(CDAWeb):
         def __init__(
-            self, root: str = "./data/WIND/TDP/ELPD/", batch_size: int = 10
+            self,
+            root: str = "./data/WIND/TDP/ELPD/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "FLUX"
             ]  ## metadata: https://cdaweb.gsfc.nasa.gov/pub/software/cdawlib/0SKELTABLES/wi_elpd_3dp_00000000_v01.skt
@@ -342,9 +380,13 @@ class WIND:
 
     class TDP_EHSP(CDAWeb):
         def __init__(
-            self, root: str = "./data/WIND/TDP/EHSP/", batch_size: int = 10
+            self,
+            root: str = "./data/WIND/TDP/EHSP/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "FLUX",
                 "ENERGY",
@@ -378,9 +420,13 @@ class WIND:
 
     class TDP_EHPD(CDAWeb):
         def __init__(
-            self, root: str = "./data/WIND/TDP/EHPD/", batch_size: int = 10
+            self,
+            root: str = "./data/WIND/TDP/EHPD/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "FLUX"
             ]  ## metadata: https://cdaweb.gsfc.nasa.gov/pub/software/cdawlib/0SKELTABLES/wi_ehpd_3dp_00000000_v01.skt
@@ -414,9 +460,13 @@ class WIND:
 
     class TDP_SFSP(CDAWeb):
         def __init__(
-            self, root: str = "./data/WIND/TDP/SFSP/", batch_size: int = 10
+            self,
+            root: str = "./data/WIND/TDP/SFSP/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "FLUX",
                 "ENERGY",
@@ -442,9 +492,13 @@ class WIND:
 
     class TDP_SFPD(CDAWeb):
         def __init__(
-            self, root: str = "./data/WIND/TDP/SFPD/", batch_size: int = 10
+            self,
+            root: str = "./data/WIND/TDP/SFPD/",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
         ) -> None:
-            super().__init__(root, batch_size)
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.phy_obs: List[str] = [
                 "FLUX"
             ]  ## metadata: https://cdaweb.gsfc.nasa.gov/pub/software/cdawlib/0SKELTABLES/wi_elpd_3dp_00000000_v01.skt
@@ -468,8 +522,14 @@ class WIND:
             )
 
     class SMS(CDAWeb):
-        def __init__(self, root: str = "./data/WIND/SMS", batch_size: int = 10) -> None:
-            super().__init__(root, batch_size)
+        def __init__(
+            self,
+            root: str = "./data/WIND/SMS",
+            batch_size: int = 10,
+            storage: str = "csv",
+            layout: str = "flat",
+        ) -> None:
+            super().__init__(root, batch_size, storage=storage, layout=layout)
             self.angle: List[int] = [53, 0, -53]
             self.phy_obs: List[str] = [
                 "counts_tc_he2plus",
@@ -0,0 +1,162 @@
+from starstream import ACE
+from starstream._base import CSV, Satellite
+from starstream._storage import write_table
+from starstream._utils import StarDate, download_url_write
+from aiohttp import web
+from spacepy import pycdf
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import polars as pl
+import numpy as np
+import asyncio
+import os
+import os.path as osp
+
+
+class Archive:
+    """Local stand-in for a remote archive, tracks the concurrent requests."""
+
+    def __init__(
+        self,
+        files: Optional[Dict[str, bytes]] = None,
+        latency: float = 0.05,
+        ranges: bool = True,
+        truncate: int = 0,
+        throttle: int = 0,
+        misrange: bool = False,
+    ) -> None:
+        self.files = files if files is not None else {}
+        self.latency = latency
+        self.ranges = ranges
+        self.truncate = truncate
+        self.throttle = throttle
+        self.misrange = misrange
+        self.served = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.app = web.Application()
+        self.app.router.add_get("/{name}", self.handler)
+
+    async def handler(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        if self.throttle:
+            self.throttle -= 1
+            return web.Response(status=429, headers={"Retry-After": "1"})
+        name: str = request.match_info["name"]
+        if name.endswith(".html"):
+            return web.Response(text="<html></html>", content_type="text/html")
+        if self.files and name not in self.files:
+            return web.Response(status=404, text="404 Not Found")
+        body: bytes = self.files.get(name, name.encode())
+        start: int = request.http_range.start or 0
+        if not self.ranges or not start:
+            return await self.respond(request, 200, body, {})
+        if start >= len(body):
+            headers = {"Content-Range": f"bytes */{len(body)}"}
+            return web.Response(status=416, headers=headers)
+        if self.misrange:
+            headers = {"Content-Range": f"bytes 0-{len(body) - 1}/{len(body)}"}
+            return await self.respond(request, 206, body, headers)
+        headers = {"Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}"}
+        return await self.respond(request, 206, body[start:], headers)
+
+    async def respond(
+        self, request: web.Request, status: int, body: bytes, headers: Dict[str, str]
+    ) -> web.StreamResponse:
+        response = web.StreamResponse(status=status, headers=headers)
+        response.content_type = "application/octet-stream"
+        response.content_length = len(body)
+        await response.prepare(request)
+        if request.method == "HEAD":
+            return response
+        if self.truncate:
+            self.truncate -= 1
+            body = body[: len(body) // 2]
+            await response.write(body)
+            self.served += len(body)
+            request.transport.close()
+            return response
+        await response.write(body)
+        self.served += len(body)
+        await response.write_eof()
+        return response
+
+
+class Served(Satellite):
+    """Daily files served by a local Archive at base."""
+
+    base: str = ""
+
+    def _find_local(self, date: StarDate) -> bool:
+        return False
+
+    def _interval_setup(self, scrap_date) -> None:
+        super()._interval_setup(scrap_date)
+        for idx, date in enumerate(self.dates):
+            name: str = f"{date.str()}.cdf"
+            self._targets(idx, [f"{self.base}/{name}"], [osp.join(self.root, name)])
+
+    async def _scrap_(self, idx: int) -> None:
+        _ = idx
+
+    async def _download_(self, idx: int) -> None:
+        await download_url_write(self, idx)
+
+    async def _prep_(self, idx: int) -> None:
+        _ = idx
+
+
+def synthetic_cdf(
+    path: str, rows: int = 1440, start: datetime = datetime(2020, 1, 1)
+) -> None:
+    with pycdf.CDF(path, "") as cdf_file:
+        rng = np.random.default_rng(start.toordinal())
+        cdf_file["Epoch"] = [start + timedelta(minutes=i) for i in range(rows)]
+        cdf_file["Magnitude"] = rng.random(rows, np.float32)
+        for var in ["BGSM", "SC_pos_GSM", "BGSEc", "SC_pos_GSE"]:
+            cdf_file[var] = rng.random((rows, 3), np.float32)
+        cdf_file["dBrms"] = rng.random(rows, np.float32)
+
+
+def prep(
+    root: str,
+    n: int,
+    keep_raw: bool = False,
+    storage: str = "csv",
+    layout: str = "flat",
+    start: datetime = datetime(2020, 1, 1),
+) -> ACE.MAG:
+    obj = ACE.MAG(root, storage=storage, layout=layout)
+    obj.keep_raw = keep_raw
+    os.makedirs(root, exist_ok=True)
+    for day in range(n):
+        obj.dates.append(StarDate(start + timedelta(days=day), obj.format))
+        obj.paths.append(obj.cdf_path(obj.dates[-1].str()))
+        synthetic_cdf(obj.paths[-1], start=obj.dates[-1].date)
+
+    async def run() -> None:
+        await asyncio.gather(*[obj._prep_(idx) for idx in range(n)])
+
+    asyncio.run(run())
+    return obj
+
+
+def hourly(root: str) -> CSV:
+    obj = CSV(root=root)
+    for day in range(1, 3):
+        start = datetime(2020, 1, day)
+        write_table(
+            pl.DataFrame(
+                {
+                    "date": [start + timedelta(hours=i) for i in range(24)],
+                    "index": [float(24 * (day - 1) + i) for i in range(24)],
+                }
+            ),
+            obj.filepath(start.strftime(obj.format)),
+        )
+    return obj
@@ -0,0 +1,33 @@
+from starstream import align
+from starstream._catalog import Catalog
+from tests.conftest import hourly, prep
+from datetime import datetime, timedelta
+import torch
+
+
+def test_align(tmp_path) -> None:
+    mag = prep(str(tmp_path / "mag"), 2)
+    index = hourly(str(tmp_path / "index"))
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 2))
+    df = align(
+        [mag, index],
+        scrap_date,
+        timedelta(minutes=30),
+        tolerance=timedelta(hours=1),
+        columns={0: ["Bnorm", "dBrms"]},
+    )
+    assert df.columns == ["date", "ACE_MAG_Bnorm", "ACE_MAG_dBrms", "CSV_index"]
+    assert df.height == 48
+    assert df["date"][1] == datetime(2020, 1, 1, 0, 30)
+    assert df["CSV_index"].to_list()[2:6] == [1.0, 1.0, 2.0, 2.0]
+    exact = align([mag, index], scrap_date, timedelta(minutes=30), output="torch")
+    assert isinstance(exact, torch.Tensor) and exact.shape[0] == 48
+    assert torch.isnan(exact[3, -1]) and not torch.isnan(exact[2, -1])
+
+
+def test_align_cataloged(tmp_path) -> None:
+    obj = hourly(str(tmp_path))
+    Catalog(obj.root, "CSV").close()
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 3))
+    df = align([obj, obj], scrap_date, timedelta(hours=2))
+    assert df.columns == ["date", "CSV0_index", "CSV1_index"] and df.height == 24
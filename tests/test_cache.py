@@ -0,0 +1,61 @@
+from starstream import RawCache
+from starstream.downloader import downloader
+from tests.conftest import Archive, Served
+from aiohttp.test_utils import TestServer
+from datetime import datetime
+from typing import List, Tuple
+import asyncio
+import os
+
+
+def fetch(archive: Archive, *rounds: Tuple[List[str], RawCache]) -> None:
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 4))
+
+    async def run() -> None:
+        async with TestServer(archive.app) as server:
+            for roots, cache in rounds:
+                objs = [Served(root=root, batch_size=2) for root in roots]
+                for obj in objs:
+                    obj.base = str(server.make_url("")).rstrip("/")
+                await downloader(objs, scrap_date, journal=False, cache=cache)
+
+    asyncio.run(run())
+
+
+def test_shared_transfers(tmp_path) -> None:
+    archive = Archive(latency=0.05)
+    roots: List[str] = [str(tmp_path / "mag"), str(tmp_path / "swe")]
+    fetch(archive, (roots, RawCache(str(tmp_path / "raw" / ".raw"))))
+    assert archive.requests == 4
+    for root in roots:
+        assert len(os.listdir(root)) == 4
+    assert not os.path.exists(tmp_path / "raw")
+
+
+def test_kept_raw_files(tmp_path) -> None:
+    archive = Archive(latency=0)
+    root: str = str(tmp_path / "raw")
+    fetch(
+        archive,
+        ([str(tmp_path / "first")], RawCache(root, keep=True)),
+        ([str(tmp_path / "second")], RawCache(root)),
+    )
+    assert archive.requests == 4
+    assert len(os.listdir(tmp_path / "raw")) == 4
+    assert len(os.listdir(tmp_path / "second")) == 4
+
+
+def test_compressed_raw_files(tmp_path) -> None:
+    archive = Archive(latency=0)
+    root: str = str(tmp_path / "raw")
+    fetch(
+        archive,
+        ([str(tmp_path / "first")], RawCache(root, keep=True, compress=True)),
+        ([str(tmp_path / "second")], RawCache(root, compress=True)),
+    )
+    assert archive.requests == 4
+    assert all(name.endswith(".gz") for name in os.listdir(tmp_path / "raw"))
+    for name in os.listdir(tmp_path / "second"):
+        with open(tmp_path / "first" / name, "rb") as first:
+            with open(tmp_path / "second" / name, "rb") as second:
+                assert first.read() == second.read()
@@ -0,0 +1,117 @@
+from starstream import PooledSession
+from starstream._base import CSV
+from starstream._catalog import Catalog, merge, subtract, to_ms
+from starstream._utils import download_url_write
+from tests.conftest import Archive, hourly
+from aiohttp.test_utils import TestServer
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict
+import asyncio
+import os
+import os.path as osp
+
+
+class Daily(CSV):
+    """Daily CSV files served by a local Archive at base."""
+
+    base: str = ""
+
+    def _interval_setup(self, scrap_date) -> None:
+        super()._interval_setup(scrap_date)
+        for idx, date in enumerate(self.dates):
+            self._targets(
+                idx, [f"{self.base}/{date.str()}.csv"], [self.filepath(date.str())]
+            )
+
+    async def _scrap_(self, idx: int) -> None:
+        _ = idx
+
+    async def _download_(self, idx: int) -> None:
+        await download_url_write(self, idx)
+
+    async def _prep_(self, idx: int) -> None:
+        _ = idx
+
+
+def daily_files(*days: int) -> Dict[str, bytes]:
+    return {
+        f"202001{day:02d}.csv": "date,value\n".encode()
+        + "".join(
+            f"2020-01-{day:02d}T{hour:02d}:00:00.000000,{hour}.0\n"
+            for hour in range(24)
+        ).encode()
+        for day in days
+    }
+
+
+def fetch(obj: Daily, files: Dict[str, bytes], scrap_date) -> int:
+    archive = Archive(files, latency=0)
+
+    async def run() -> None:
+        async with TestServer(archive.app) as server:
+            obj.base = str(server.make_url("")).rstrip("/")
+            async with PooledSession() as session:
+                await obj.fetch(scrap_date, session)
+
+    asyncio.run(run())
+    return archive.requests
+
+
+def test_interval_arithmetic() -> None:
+    assert merge([(5, 8), (0, 2), (2, 4), (7, 10)]) == [(0, 4), (5, 10)]
+    assert subtract((0, 12), [(0, 4), (5, 10)]) == [(4, 5), (10, 12)]
+    assert subtract((6, 9), [(0, 4), (5, 10)]) == []
+    assert to_ms(datetime(1970, 1, 2)) == 86_400_000
+
+
+def test_catalog_coverage(tmp_path) -> None:
+    files = daily_files(1, 2, 3, 4)
+    obj = Daily(root=str(tmp_path))
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 3))
+    assert fetch(obj, files, scrap_date) == 3
+    catalog = Catalog(str(tmp_path), "Daily")
+    span = (to_ms(datetime(2020, 1, 1)), to_ms(datetime(2020, 1, 5)))
+    assert catalog.stats()[:2] == (3, None)
+    assert catalog.missing(span) == [(to_ms(datetime(2020, 1, 4)), span[1])]
+
+    os.remove(obj.filepath("20200102"))
+    assert fetch(obj, files, (datetime(2020, 1, 1), datetime(2020, 1, 4))) == 2
+    assert catalog.missing(span) == []
+
+    os.remove(obj.filepath("20200104"))
+    (df,) = obj.get_polars((datetime(2020, 1, 1), datetime(2020, 1, 5)))
+    assert len(df) == 3 * 24 - 1 and catalog.stats()[0] == 4
+    catalog.close()
+
+
+def test_processing_version(tmp_path, monkeypatch) -> None:
+    files = daily_files(1, 2)
+    obj = Daily(root=str(tmp_path))
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 2))
+    span = (to_ms(datetime(2020, 1, 1)), to_ms(datetime(2020, 1, 3)))
+    assert fetch(obj, files, scrap_date) == 2
+    monkeypatch.setattr(Daily, "processing_version", 2)
+    catalog = Catalog(str(tmp_path), "Daily")
+    assert catalog.missing(span, 2) == [span]
+    (df,) = obj.get_polars((datetime(2020, 1, 1), datetime(2020, 1, 3)))
+    assert len(df) == 2 * 24 - 1
+    assert fetch(obj, files, scrap_date) == 2
+    assert catalog.missing(span, 2) == []
+    catalog.close()
+
+
+def test_threaded_queries(tmp_path) -> None:
+    obj = hourly(str(tmp_path))
+    Catalog(obj.root, "CSV").close()
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 3))
+
+    def query(_) -> int:
+        (df,) = obj.get_polars(scrap_date)
+        return df.height
+
+    with ThreadPoolExecutor(4) as pool:
+        assert list(pool.map(query, range(8))) == [47] * 8
+    catalog = Catalog(obj.root, "CSV")
+    assert catalog.stats()[0] == 0
+    catalog.close()
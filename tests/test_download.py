@@ -0,0 +1,262 @@
+from starstream import ConnectionPool, PooledSession
+from starstream._base import MISSING_TTL, Satellite
+from starstream._journal import Journal
+from starstream.downloader import downloader
+from starstream.dst import Dst
+from tests.conftest import Archive, Served
+from starstream._utils import (
+    StarDate,
+    download_url_prep,
+    download_url_write,
+    fetch_part,
+    part_path,
+)
+from starstream._ratelimit import HostLimiter, parse_retry_after
+from aiohttp import ClientPayloadError
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+import time
+from aiohttp.test_utils import TestServer
+from typing import List, Optional
+import asyncio
+import json
+import os
+import os.path as osp
+
+
+async def concurrent_gets(pool: ConnectionPool, n: int) -> int:
+    archive = Archive()
+    async with TestServer(archive.app) as server:
+        async with PooledSession(pool) as session:
+
+            async def get(idx: int) -> bytes:
+                async with session.get(str(server.make_url(f"/{idx}"))) as response:
+                    return await response.read()
+
+            out = await asyncio.gather(*[get(idx) for idx in range(n)])
+    assert out == [str(idx).encode() for idx in range(n)]
+    return archive.max_in_flight
+
+
+def test_limit_per_host() -> None:
+    assert asyncio.run(concurrent_gets(ConnectionPool(limit_per_host=2), 10)) == 2
+
+
+def test_host_override() -> None:
+    pool = ConnectionPool(limit_per_host=8, hosts={"127.0.0.1": 1})
+    assert asyncio.run(concurrent_gets(pool, 5)) == 1
+
+
+def test_global_limit() -> None:
+    pool = ConnectionPool(limit=3, limit_per_host=8)
+    assert asyncio.run(concurrent_gets(pool, 10)) <= 3
+
+
+async def download(
+    archive: Archive,
+    root: str,
+    names: List[str],
+    method=None,
+    pool: Optional[ConnectionPool] = None,
+    journal: Optional[Journal] = None,
+    rounds: int = 1,
+) -> Satellite:
+    obj = Satellite(root=root, journal=journal)
+    async with TestServer(archive.app) as server:
+        async with PooledSession(pool) as session:
+            obj.session = session
+            obj.urls = [str(server.make_url(f"/{name}")) for name in names]
+            obj.paths = [osp.join(root, name) for name in names]
+            for _ in range(rounds):
+                for idx in range(len(names)):
+                    if method is None:
+                        await download_url_write(obj, idx)
+                    else:
+                        await download_url_prep(obj, idx, method)
+    return obj
+
+
+def test_streaming_write(tmp_path) -> None:
+    payload: bytes = os.urandom(3 * (1 << 20) + 17)
+    archive = Archive({"large.fits": payload})
+    asyncio.run(
+        download(archive, str(tmp_path), ["large.fits", "missing.fits", "page.html"])
+    )
+    assert sorted(os.listdir(tmp_path)) == ["large.fits"]
+    with open(tmp_path / "large.fits", "rb") as file:
+        assert file.read() == payload
+
+
+def test_streaming_prep(tmp_path) -> None:
+    payload: bytes = os.urandom(1 << 20)
+    archive = Archive({"data.cdf": payload})
+    read: List[bytes] = []
+
+    def method(path: str) -> None:
+        with open(path, "rb") as file:
+            read.append(file.read())
+
+    asyncio.run(download(archive, str(tmp_path), ["data.cdf"], method))
+    assert read == [payload]
+    assert os.listdir(tmp_path) == []
+
+
+def test_resume_from_part(tmp_path) -> None:
+    payload: bytes = os.urandom(1 << 20)
+    with open(part_path(str(tmp_path / "aia.jp2")), "wb") as file:
+        file.write(payload[:1000])
+    archive = Archive({"aia.jp2": payload})
+    asyncio.run(download(archive, str(tmp_path), ["aia.jp2"]))
+    assert archive.served == len(payload) - 1000
+    assert os.listdir(tmp_path) == ["aia.jp2"]
+    with open(tmp_path / "aia.jp2", "rb") as file:
+        assert file.read() == payload
+
+
+def test_resume_without_ranges(tmp_path) -> None:
+    payload: bytes = os.urandom(1 << 16)
+    with open(part_path(str(tmp_path / "aia.jp2")), "wb") as file:
+        file.write(b"stale")
+    archive = Archive({"aia.jp2": payload}, ranges=False)
+    asyncio.run(download(archive, str(tmp_path), ["aia.jp2"]))
+    with open(tmp_path / "aia.jp2", "rb") as file:
+        assert file.read() == payload
+
+
+def test_resume_misplaced_range(tmp_path) -> None:
+    payload: bytes = os.urandom(1 << 16)
+    with open(part_path(str(tmp_path / "aia.jp2")), "wb") as file:
+        file.write(payload[:1000])
+    archive = Archive({"aia.jp2": payload}, misrange=True)
+    asyncio.run(download(archive, str(tmp_path), ["aia.jp2"]))
+    assert archive.requests == 2
+    with open(tmp_path / "aia.jp2", "rb") as file:
+        assert file.read() == payload
+
+
+def test_resume_complete_part(tmp_path) -> None:
+    payload: bytes = os.urandom(1 << 16)
+    with open(part_path(str(tmp_path / "aia.jp2")), "wb") as file:
+        file.write(payload)
+    archive = Archive({"aia.jp2": payload})
+    asyncio.run(download(archive, str(tmp_path), ["aia.jp2"]))
+    assert archive.served == 0
+    with open(tmp_path / "aia.jp2", "rb") as file:
+        assert file.read() == payload
+
+
+def test_resume_interrupted(tmp_path) -> None:
+    payload: bytes = os.urandom(5 << 20)
+    path: str = str(tmp_path / "costep.tar.gz")
+    archive = Archive({"costep.tar.gz": payload}, truncate=1)
+
+    async def run() -> None:
+        obj = Satellite(root=str(tmp_path))
+        async with TestServer(archive.app) as server:
+            async with PooledSession() as session:
+                obj.session = session
+                url: str = str(server.make_url("/costep.tar.gz"))
+                try:
+                    await fetch_part(obj, url, path)
+                except ClientPayloadError:
+                    pass
+                assert 0 < osp.getsize(part_path(path)) < len(payload)
+                assert await fetch_part(obj, url, path)
+
+    asyncio.run(run())
+    assert archive.served < 2 * len(payload)
+    with open(part_path(path), "rb") as file:
+        assert file.read() == payload
+
+
+def test_negative_cache(tmp_path) -> None:
+    archive = Archive({"data.cdf": b"data"}, latency=0)
+    journal = Journal(str(tmp_path), "Satellite")
+    names: List[str] = ["missing.cdf", "page.html", "data.cdf"]
+    obj = asyncio.run(
+        download(archive, str(tmp_path), names, journal=journal, rounds=3)
+    )
+    assert archive.requests == len(names) + 4
+    assert journal.known_missing(obj.urls[0])
+    assert not journal.known_missing(obj.urls[1])
+    assert not journal.known_missing(obj.urls[2])
+    journal.mark_missing(obj.urls[0], 0)
+    assert not journal.known_missing(obj.urls[0])
+    journal.close()
+
+
+def test_missing_ttl() -> None:
+    dst = Dst()
+    assert dst._missing_ttl(dst._date_to_url("199001")) == MISSING_TTL
+    realtime: str = dst._date_to_url(f"{datetime.today().year}01")
+    assert dst._missing_ttl(realtime) < timedelta(days=1)
+    obj = Satellite()
+    for idx, age in enumerate(
+        [timedelta(days=1), timedelta(days=30), timedelta(days=400)]
+    ):
+        obj.dates.append(StarDate(datetime.now() - age, obj.format))
+        obj._targets(idx, [f"https://archive/{idx}.cdf"], [f"{idx}.cdf"])
+    ttls: List[timedelta] = [obj._missing_ttl(url) for url in obj.urls]
+    assert ttls[0] < ttls[1] < ttls[2] == MISSING_TTL
+    assert obj._missing_ttl("https://archive/unknown.cdf") == MISSING_TTL
+
+
+def test_metrics(tmp_path) -> None:
+    archive = Archive(latency=0)
+    obj = Served(root=str(tmp_path / "served"), batch_size=2)
+    path: str = str(tmp_path / "metrics.jsonl")
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 5))
+
+    async def run() -> None:
+        async with TestServer(archive.app) as server:
+            obj.base = str(server.make_url("")).rstrip("/")
+            await downloader([obj], scrap_date, journal=False, metrics=path)
+
+    asyncio.run(run())
+    with open(path) as file:
+        events = [json.loads(line) for line in file]
+    stages = [event for event in events if event["event"] == "stage"]
+    summary = {
+        (row["satellite"], row["stage"]): row
+        for row in events
+        if row["event"] == "summary"
+    }
+    transfers = [event for event in stages if event["stage"] == "transfer"]
+    assert len(transfers) == 5
+    assert {event["host"] for event in transfers} == {"127.0.0.1"}
+    assert summary[("Served", "transfer")]["bytes"] == archive.served
+    assert summary[("Served", "download")]["count"] == 5
+    assert summary[("Served", "queue")]["max_depth"] >= 1
+    assert summary[("Served", "fetch")]["failures"] == 0
+    assert summary[("", "connect")]["count"] >= 1
+
+
+def test_retry_after(tmp_path) -> None:
+    archive = Archive({"dst2001.for.request": b"dst"}, throttle=1)
+    start: float = time.perf_counter()
+    asyncio.run(download(archive, str(tmp_path), ["dst2001.for.request"]))
+    assert time.perf_counter() - start >= 1
+    assert os.listdir(tmp_path) == ["dst2001.for.request"]
+
+
+def test_parse_retry_after() -> None:
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after(None) is None
+    date = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 20 < parse_retry_after(format_datetime(date, usegmt=True)) <= 30
+
+
+def test_aimd_limiter() -> None:
+    async def run() -> HostLimiter:
+        limiter = HostLimiter(limit=8, rate=1000.0)
+        await limiter.acquire()
+        await limiter.release(throttled=True)
+        assert (limiter.limit, limiter.rate) == (4, 500)
+        for _ in range(100):
+            await limiter.acquire()
+            await limiter.release()
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.limit == 8
+    assert 500 < limiter.rate < 1000
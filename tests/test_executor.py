@@ -0,0 +1,73 @@
+from starstream import set_prep_workers, set_thread_workers, shutdown_executors
+from starstream._executor import shutdown_prep_workers, thread_pool
+from starstream._utils import asyncGZIP
+from tests.conftest import prep
+from datetime import datetime
+from typing import List
+import polars as pl
+import asyncio
+import gzip
+import os
+import os.path as osp
+
+
+def test_cdf_prep_process_pool(tmp_path) -> None:
+    set_prep_workers(2)
+    try:
+        obj = prep(str(tmp_path), 4)
+    finally:
+        shutdown_prep_workers()
+    assert sorted(os.listdir(tmp_path)) == [f"2020010{i}.csv" for i in range(1, 5)]
+    df = pl.read_csv(obj.filepath("20200101"), try_parse_dates=True)
+    assert df.columns == obj.variables + ["date"]
+    assert df.height == 1440
+
+
+def test_cdf_prep_threads(tmp_path) -> None:
+    set_thread_workers(8)
+    try:
+        prep(str(tmp_path), 8)
+    finally:
+        set_thread_workers(None)
+    assert not osp.exists(tmp_path / "20200101.cdf")
+    assert sorted(os.listdir(tmp_path)) == [f"2020010{i}.csv" for i in range(1, 9)]
+
+
+def test_cdf_reprocess(tmp_path) -> None:
+    obj = prep(str(tmp_path), 3, keep_raw=True)
+    store = obj.raw_store()
+    raw: List[str] = [store.path(obj.url(f"2020010{i}")) for i in range(1, 4)]
+    assert sorted(os.listdir(tmp_path / "raw")) == sorted(map(osp.basename, raw))
+    assert all(path.endswith(".cdf.gz") for path in raw)
+    obj.phy_obs, obj.variables = ["Magnitude", "dBrms"], ["Bnorm", "dBrms"]
+    throughput = obj.reprocess((datetime(2020, 1, 1), datetime(2020, 1, 4)))
+    assert throughput.items == 3
+    assert throughput.failed == ["20200104"]
+    df = pl.read_csv(obj.filepath("20200102"), try_parse_dates=True)
+    assert df.columns == ["Bnorm", "dBrms", "date"]
+    assert df.height == 1440
+    assert sorted(os.listdir(tmp_path)) == [f"2020010{i}.csv" for i in range(1, 4)] + [
+        "raw"
+    ]
+
+
+def test_shared_thread_pool(tmp_path) -> None:
+    path: str = str(tmp_path / "data.gz")
+    with gzip.open(path, "wb") as file:
+        file.write(b"starstream")
+
+    async def read() -> bytes:
+        return await asyncGZIP(path, lambda gz_file: gz_file.read())
+
+    pool = thread_pool()
+    assert [asyncio.run(read()) for _ in range(3)] == [b"starstream"] * 3
+    assert thread_pool() is pool
+
+    set_thread_workers(2)
+    try:
+        assert thread_pool() is not pool
+        assert thread_pool()._max_workers == 2
+    finally:
+        set_thread_workers(None)
+    shutdown_executors()
+    assert asyncio.run(read()) == b"starstream"
@@ -0,0 +1,48 @@
+from starstream._inventory import Inventory
+from starstream.goes import GOES16, suvi_day
+from starstream._utils import StarDate
+from datetime import datetime
+from glob import glob
+import os
+import os.path as osp
+
+
+def test_inventory(tmp_path, monkeypatch) -> None:
+    names = [
+        ".hidden_2020",
+        "2020_01_01__00.jp2",
+        "2020_01_01__12.jp2",
+        "2020_01_02.jp2",
+    ]
+    for name in names:
+        (tmp_path / name).touch()
+    patterns = [
+        osp.join(tmp_path, pattern)
+        for pattern in ["2020_01_01*", "*2020*", "2020_01_0?.jp2", "2021*", ".*"]
+    ]
+    expected = [sorted(glob(pattern)) for pattern in patterns]
+    scans = []
+    scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: scans.append(path) or scandir(path))
+    inventory = Inventory()
+    assert [inventory.glob(pattern) for pattern in patterns] == expected
+    assert inventory.exists(osp.join(tmp_path, "2020_01_02.jp2"))
+    assert not inventory.exists(osp.join(tmp_path, "2020_01_03.jp2"))
+    assert inventory.glob(osp.join(tmp_path, "missing", "*")) == []
+    assert len(scans) == 2
+
+
+def test_suvi_index(tmp_path) -> None:
+    obj = GOES16("fe171", root=str(tmp_path))
+    os.makedirs(obj.root)
+    for stamp in ["2020001000000", "2020001235900", "2020002000000"]:
+        name = f"OR_SUVI-L1b-Fe171_G16_s{stamp}0_e{stamp}1_c2020002{stamp[7:]}2.fits"
+        (tmp_path / obj.instrument / name).touch()
+    assert suvi_day("OR_SUVI-L1b-Fe171_G16_s20200011200000_e.fits") == "2020001"
+    with obj._scanned():
+        first = obj._find_local(StarDate(datetime(2020, 1, 1), "%Y%m%d"))
+        second = obj._find_local(StarDate(datetime(2020, 1, 2), "%Y%m%d"))
+        assert len(obj.inventory.names) == 1
+    assert first[0] and len(first[1]) == 2
+    assert second[0] and len(second[1]) == 1
+    assert obj.inventory is None
@@ -0,0 +1,46 @@
+from starstream._catalog import Catalog
+from tests.conftest import hourly, prep
+from datetime import datetime, timedelta
+import polars as pl
+import numpy as np
+import pytest
+
+
+def test_iter_chunks(tmp_path) -> None:
+    obj = prep(str(tmp_path), 3)
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 4))
+    chunks = list(obj.iter_polars(scrap_date, timedelta(days=1), columns=["Bnorm"]))
+    assert [df.height for df in chunks] == [1439, 1440, 1440]
+    assert chunks[1]["date"][0] == datetime(2020, 1, 2)
+    (whole,) = obj.get_polars(scrap_date, columns=["Bnorm"])
+    assert pl.concat(chunks).equals(whole)
+    (hourly,) = obj.get_polars(scrap_date, timedelta(hours=1), ["Bnorm"])
+    arrays = list(obj.iter_numpy(scrap_date, timedelta(days=2), timedelta(hours=1)))
+    assert [array.shape for array in arrays] == [(48, 14), (24, 14)]
+    tensors = obj.iter_torch(scrap_date, timedelta(days=1), timedelta(hours=1))
+    assert np.allclose(
+        np.concatenate([tensor.numpy() for tensor in tensors])[:, 0],
+        hourly["Bnorm"].to_numpy(),
+    )
+
+
+def test_iter_short_chunks(tmp_path) -> None:
+    obj = prep(str(tmp_path), 3)
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 6))
+    quarters = list(obj.iter_polars(scrap_date, timedelta(hours=6), columns=["Bnorm"]))
+    assert [df.height for df in quarters] == [359] + [360] * 11
+    crossing = pl.concat(obj.iter_polars(scrap_date, timedelta(hours=18)))
+    assert crossing.height == 3 * 1440 - 1 and crossing["date"].is_unique().all()
+    with pytest.raises(pl.exceptions.ColumnNotFoundError):
+        list(obj.iter_polars(scrap_date, timedelta(days=1), columns=["missing"]))
+
+
+def test_iter_cataloged(tmp_path) -> None:
+    obj = hourly(str(tmp_path))
+    Catalog(obj.root, "CSV").close()
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 3))
+    chunks = 0
+    for chunk in obj.iter_polars(scrap_date, timedelta(days=1)):
+        (whole,) = obj.get_polars(scrap_date)
+        chunks += 1
+    assert chunks == 2 and whole.height == 47
@@ -0,0 +1,59 @@
+from starstream._base import Img
+from datetime import datetime
+from typing import List, Optional
+import os.path as osp
+import asyncio
+
+
+class Listing(Img):
+    """Scrapes three files per day and writes them on download."""
+
+    def scrap_path(self, date: str) -> str:
+        return osp.join(self.root, f"{date}-*")
+
+    async def _scrap_(self, idx: int) -> None:
+        date: str = self.dates[idx].str()
+        names: List[str] = [f"{date}-{i}" for i in range(3)]
+        self.scraps.append(date)
+        self._targets(
+            idx,
+            [f"synthetic://{name}" for name in names],
+            [osp.join(self.root, name) for name in names],
+        )
+
+    async def _download_(self, idx: int) -> None:
+        if idx in self.broken:
+            raise RuntimeError("Connection dropped")
+        with open(self.paths[idx], "w") as file:
+            file.write(self.urls[idx])
+        self.downloads.append(osp.basename(self.paths[idx]))
+
+    async def _prep_(self, idx: int) -> None:
+        _ = idx
+
+
+def fetch(root: str, broken: Optional[List[int]] = None) -> Listing:
+    obj = Listing(root=root, batch_size=5)
+    obj.scraps, obj.downloads, obj.broken = [], [], broken or []
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 2))
+    try:
+        asyncio.run(obj.fetch(scrap_date, None))
+    except RuntimeError:
+        pass
+    return obj
+
+
+def test_resume_from_journal(tmp_path) -> None:
+    first = fetch(str(tmp_path), broken=[4])
+    assert first.scraps == ["20200101", "20200102"]
+    assert "20200102-1" not in first.downloads
+
+    second = fetch(str(tmp_path))
+    assert second.scraps == []
+    assert sorted(first.downloads + second.downloads) == [
+        f"{date}-{i}" for date in ["20200101", "20200102"] for i in range(3)
+    ]
+
+    third = fetch(str(tmp_path))
+    assert third.dates == []
+    assert third.downloads == []
@@ -0,0 +1,22 @@
+from tests.conftest import prep
+from datetime import datetime
+import numpy as np
+import os.path as osp
+
+
+def test_hive_layout(tmp_path) -> None:
+    start = datetime(2020, 1, 30)
+    scrap_date = (datetime(2020, 1, 31), datetime(2020, 2, 2))
+    flat = prep(str(tmp_path / "flat"), 4, start=start)
+    (expected,) = flat.get_polars(scrap_date, columns=["Bnorm"])
+    assert expected.columns == ["date", "Bnorm"] and expected.height == 2 * 1440 - 1
+    for storage in ["csv", "parquet"]:
+        obj = prep(
+            str(tmp_path / storage), 4, storage=storage, layout="hive", start=start
+        )
+        assert osp.exists(
+            tmp_path / storage / "year=2020" / "month=02" / f"20200201.{storage}"
+        )
+        (df,) = obj.get_polars(scrap_date, columns=["Bnorm"])
+        assert df["date"].to_list() == expected["date"].to_list()
+        assert np.allclose(df["Bnorm"].to_numpy(), expected["Bnorm"].to_numpy())
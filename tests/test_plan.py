@@ -0,0 +1,66 @@
+from starstream import PooledSession
+from starstream._utils import StarDate, download_url_write
+from starstream._base import Satellite
+from tests.conftest import Archive
+from aiohttp.test_utils import TestServer
+from datetime import datetime
+from typing import List
+import asyncio
+import os
+import os.path as osp
+
+
+class Scraped(Satellite):
+    """Two files per day, discovered by scraping the local Archive."""
+
+    base: str = ""
+
+    def _find_local(self, date: StarDate) -> bool:
+        return osp.exists(osp.join(self.root, f"{date.str()}-0.cdf"))
+
+    async def _scrap_(self, idx: int) -> None:
+        date: str = self.dates[idx].str()
+        self.scraps.append(date)
+        names: List[str] = [f"{date}-{i}.cdf" for i in range(2)]
+        self._targets(
+            idx,
+            [f"{self.base}/{name}" for name in names],
+            [osp.join(self.root, name) for name in names],
+        )
+
+    async def _download_(self, idx: int) -> None:
+        await download_url_write(self, idx)
+
+    async def _prep_(self, idx: int) -> None:
+        _ = idx
+
+
+def test_plan_then_fetch(tmp_path) -> None:
+    dates: List[str] = ["20200101", "20200102", "20200103"]
+    files = {
+        f"{date}-{i}.cdf": os.urandom(100 * (i + 1)) for date in dates for i in range(2)
+    }
+    archive = Archive(files, latency=0)
+    obj = Scraped(root=str(tmp_path))
+    obj.scraps = []
+    for i in range(2):
+        with open(tmp_path / f"20200103-{i}.cdf", "wb") as file:
+            file.write(files[f"20200103-{i}.cdf"])
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 3))
+
+    async def run():
+        async with TestServer(archive.app) as server:
+            obj.base = str(server.make_url("")).rstrip("/")
+            async with PooledSession() as session:
+                plan = await obj.plan(scrap_date, session)
+                planned: List[str] = sorted(os.listdir(tmp_path))
+                await obj.fetch(scrap_date, session, plan=plan)
+        return plan, planned
+
+    plan, planned = asyncio.run(run())
+    assert planned == [".starstream.sqlite", "20200103-0.cdf", "20200103-1.cdf"]
+    assert len(plan.urls) == 4 and plan.bytes == 600 and plan.unknown == 0
+    assert plan.local == ["20200103"]
+    assert sorted(plan.targets) == ["20200101", "20200102"]
+    assert obj.scraps == ["20200101", "20200102"]
+    assert sorted(os.listdir(tmp_path)) == sorted([*files, ".starstream.sqlite"])
@@ -0,0 +1,20 @@
+from tests.conftest import prep
+from datetime import datetime, timedelta
+
+
+def test_lazy_query(tmp_path) -> None:
+    obj = prep(str(tmp_path), 3)
+    scrap_date = [
+        (datetime(2020, 1, 1), datetime(2020, 1, 2)),
+        (datetime(2020, 1, 2), datetime(2020, 1, 4)),
+    ]
+    first, second = obj.get_polars(scrap_date, timedelta(hours=1))
+    assert first.height >= 1 and second.height > first.height
+    assert first.columns == ["date", *obj.variables]
+    obj.streaming = True
+    assert all(
+        df.equals(expected)
+        for df, expected in zip(
+            obj.get_polars(scrap_date, timedelta(hours=1)), (first, second)
+        )
+    )
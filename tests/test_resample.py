@@ -0,0 +1,106 @@
+from starstream import _base
+from starstream._resample import combine, resample
+from starstream._storage import scan_table
+from tests.conftest import prep
+from datetime import datetime, timedelta
+from typing import List
+import polars as pl
+import numpy as np
+import os
+import os.path as osp
+import time
+
+
+def frame() -> pl.LazyFrame:
+    dates = [datetime(2020, 1, 1) + timedelta(seconds=i) for i in range(7200)]
+    return pl.LazyFrame({"date": dates, "x": [float(i) for i in range(7200)]})
+
+
+def test_resample_windows() -> None:
+    df = resample(frame(), timedelta(minutes=1)).collect()
+    assert df.height == 120
+    assert df["date"][1] == datetime(2020, 1, 1, 0, 1)
+    assert df["x"][0] == 29.5
+    right = resample(frame(), timedelta(hours=1), "last", label="right").collect()
+    assert right["date"].to_list() == [datetime(2020, 1, 1, 1), datetime(2020, 1, 1, 2)]
+    assert right["x"].to_list() == [3599.0, 7199.0]
+
+
+def test_resample_several() -> None:
+    df = resample(
+        frame(), timedelta(hours=1), ["mean", "min", "max", "std", "median", "count"]
+    ).collect()
+    assert df.columns == [
+        "date",
+        "x_mean",
+        "x_min",
+        "x_max",
+        "x_std",
+        "x_median",
+        "x_count",
+    ]
+    assert df["x_min"].to_list() == [0.0, 3600.0]
+    assert df["x_count"].to_list() == [3600, 3600]
+    assert df["x_median"].to_list() == df["x_mean"].to_list()
+
+
+def test_query_resolution(tmp_path) -> None:
+    obj = prep(str(tmp_path), 2)
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 3))
+    (df,) = obj.get_polars(scrap_date, timedelta(hours=1), agg={"Bnorm": ["max"]})
+    assert df.columns == ["date", "Bnorm"] and df.height == 48
+    (raw,) = obj.get_polars(scrap_date, columns=["Bnorm"])
+    expected = raw.filter(pl.col("date") < datetime(2020, 1, 1, 1))["Bnorm"].max()
+    assert df["Bnorm"][0] == expected
+
+
+def test_rollups(tmp_path, monkeypatch) -> None:
+    obj = prep(str(tmp_path), 2)
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 3))
+    agg = ["mean", "min", "std", "count", "last"]
+    (raw,) = obj.get_polars(scrap_date, timedelta(hours=2), ["Bnorm"], agg)
+    obj.rollups = [timedelta(minutes=10), timedelta(hours=1)]
+    obj.materialize(scrap_date)
+    assert obj._rollup_for(timedelta(hours=2), agg) == timedelta(hours=1)
+    assert obj._rollup_for(timedelta(minutes=30), agg) == timedelta(minutes=10)
+    assert obj._rollup_for(timedelta(hours=2), "median") is None
+    assert osp.exists(obj.rollup_path("20200102", timedelta(hours=1)))
+    combined: List[int] = []
+    monkeypatch.setattr(
+        _base, "combine", lambda *args: combined.append(1) or combine(*args)
+    )
+    (rolled,) = obj.get_polars(scrap_date, timedelta(hours=2), ["Bnorm"], agg)
+    assert combined and rolled.schema == raw.schema and rolled.height == 24
+    assert rolled["date"].equals(raw["date"])
+    assert rolled["Bnorm_count"].equals(raw["Bnorm_count"])
+    for name in ["Bnorm_mean", "Bnorm_min", "Bnorm_std", "Bnorm_last"]:
+        assert np.allclose(rolled[name], raw[name], atol=1e-6)
+
+    # Rewriting a file makes its rollups stale until they are written again
+    path: str = obj.filepath("20200102")
+    pl.read_csv(path).with_columns(pl.col("Bnorm") * 2).write_csv(path)
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    combined.clear()
+    (rewritten,) = obj.get_polars(scrap_date, timedelta(hours=2), ["Bnorm"], agg)
+    assert not combined
+    assert np.allclose(rewritten["Bnorm_mean"][12:], 2 * raw["Bnorm_mean"][12:])
+
+
+def test_rollup_edges(tmp_path, monkeypatch) -> None:
+    obj = prep(str(tmp_path), 4)
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 5))
+    (raw,) = obj.get_polars(scrap_date, timedelta(hours=2), ["Bnorm"])
+    obj.rollups = [timedelta(hours=1)]
+    obj.materialize(scrap_date)
+    scanned: List[str] = []
+
+    def spy(path):
+        scanned.extend([path] if isinstance(path, str) else path)
+        return scan_table(path)
+
+    monkeypatch.setattr(_base, "scan_table", spy)
+    (rolled,) = obj.get_polars(scrap_date, timedelta(hours=2), ["Bnorm"])
+    assert rolled["date"].equals(raw["date"])
+    assert np.allclose(rolled["Bnorm"], raw["Bnorm"], atol=1e-6)
+    files = {osp.basename(path) for path in scanned if "rollup=" not in path}
+    assert files == {"20200101.csv"}
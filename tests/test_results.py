@@ -0,0 +1,46 @@
+from starstream import ResultCache, set_result_cache
+from starstream._results import result_cache
+from tests.conftest import hourly
+from datetime import datetime, timedelta
+import polars as pl
+import os
+
+
+def test_result_cache(tmp_path) -> None:
+    default = result_cache()
+    assert default is None
+    cache = ResultCache()
+    set_result_cache(cache)
+    try:
+        obj = hourly(str(tmp_path))
+        scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 3))
+        (first,) = obj.get_polars(scrap_date, timedelta(hours=2))
+        (second,) = obj.get_polars(scrap_date, timedelta(hours=2))
+        assert second.equals(first) and (cache.hits, cache.misses) == (1, 1)
+        second.drop_in_place("index")
+        first.insert_column(1, pl.Series("extra", [0] * first.height))
+        (fourth,) = obj.get_polars(scrap_date, timedelta(hours=2))
+        assert fourth.columns == ["date", "index"] and cache.hits == 2
+        obj.get_numpy(scrap_date, timedelta(hours=2), agg="max")
+        assert cache.misses == 2 and len(cache.entries) == 2
+
+        path: str = obj.filepath("20200102")
+        pl.read_csv(path).head(12).write_csv(path)
+        os.utime(path, ns=(0, 0))
+        (third,) = obj.get_polars(scrap_date, timedelta(hours=2))
+        assert cache.misses == 3 and third.height == 18
+    finally:
+        set_result_cache(default)
+
+
+def test_result_budget(tmp_path) -> None:
+    frames = [pl.DataFrame({"x": [float(i)] * 1000}) for i in range(3)]
+    cache = ResultCache(budget=2 * frames[0].estimated_size(), path=str(tmp_path))
+    for i, df in enumerate(frames):
+        cache.put(i, (), [df])
+    assert list(cache.entries) == [1, 2]
+    assert cache.get(0, ()) is not None and cache.get(0, ("changed",)) is None
+    assert list(cache.entries) == [2]
+    assert all(name.endswith((".parquet", ".json")) for name in os.listdir(tmp_path))
+    warm = ResultCache(path=str(tmp_path))
+    assert warm.get(1, ())[0].equals(frames[1]) and warm.hits == 1
@@ -0,0 +1,138 @@
+from starstream._base import Satellite
+from starstream._utils import StarDate, handle_client_connection_error
+from aiohttp import ClientConnectionError
+from datetime import datetime
+from typing import List
+import asyncio
+
+
+class Synthetic(Satellite):
+    def _find_local(self, date: StarDate) -> bool:
+        return False
+
+    async def _scrap_(self, idx: int) -> None:
+        self.urls.append(f"synthetic://{self.dates[idx].str()}")
+        self.paths.append(self.dates[idx].str())
+
+    async def _download_(self, idx: int) -> None:
+        if idx < len(self.urls):
+            await asyncio.sleep(0.2 if idx % self.batch_size == 0 else 0.01)
+            self.downloaded.append(idx)
+
+    async def _prep_(self, idx: int) -> None:
+        if idx < len(self.paths):
+            self.prepped.append(idx)
+
+
+def synthetic(root: str) -> Synthetic:
+    obj = Synthetic(root=root, batch_size=5)
+    obj.downloaded: List[int] = []
+    obj.prepped: List[int] = []
+    return obj
+
+
+def fetch(root: str, scheduler: str):
+    obj = synthetic(root)
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 20))
+    throughput = asyncio.run(obj.fetch(scrap_date, None, scheduler, journal=False))
+    return obj, throughput
+
+
+def test_pipeline_completes(tmp_path) -> None:
+    obj, throughput = fetch(str(tmp_path), "pipeline")
+    assert throughput.items == 20
+    assert sorted(obj.downloaded) == list(range(20))
+    assert sorted(obj.prepped) == list(range(20))
+
+
+class Gated(Synthetic):
+    """The first download waits until a download of the next batch starts."""
+
+    async def _download_(self, idx: int) -> None:
+        if idx >= len(self.urls):
+            return
+        if idx == self.batch_size:
+            self.gate.set()
+        if idx == 0:
+            try:
+                await asyncio.wait_for(self.gate.wait(), 0.5)
+                self.overtaken = True
+            except asyncio.TimeoutError:
+                self.overtaken = False
+        self.downloaded.append(idx)
+
+
+def test_pipeline_outpaces_batch(tmp_path) -> None:
+    overtaken: List[bool] = []
+    for scheduler in ["pipeline", "batch"]:
+        obj = Gated(root=str(tmp_path / scheduler), batch_size=5)
+        obj.downloaded, obj.prepped, obj.gate = [], [], asyncio.Event()
+        scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 20))
+        throughput = asyncio.run(obj.fetch(scrap_date, None, scheduler, journal=False))
+        assert throughput.items == 20
+        overtaken.append(obj.overtaken)
+    # A slow download holds a whole batch, not the pipeline's other slots
+    assert overtaken == [True, False]
+
+
+class SlowPrep(Synthetic):
+    async def _download_(self, idx: int) -> None:
+        if idx < len(self.urls):
+            self.downloaded.append(idx)
+
+    async def _prep_(self, idx: int) -> None:
+        if idx < len(self.paths):
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.02)
+            self.active -= 1
+            self.prepped.append(idx)
+
+
+def test_pipeline_bounds_prep(tmp_path) -> None:
+    obj = SlowPrep(root=str(tmp_path), batch_size=3)
+    obj.downloaded, obj.prepped, obj.active, obj.peak = [], [], 0, 0
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 20))
+    throughput = asyncio.run(obj.fetch(scrap_date, None, journal=False))
+    assert throughput.items == 20 and sorted(obj.prepped) == list(range(20))
+    assert obj.peak == 3
+
+
+class Flaky(Synthetic):
+    @handle_client_connection_error(default_cooldown=0, max_retries=3)
+    async def _download_(self, idx: int) -> None:
+        if idx >= len(self.urls):
+            return
+        self.attempts[idx] = self.attempts.get(idx, 0) + 1
+        if idx == 0 or (idx == 1 and self.attempts[idx] < 3):
+            raise ClientConnectionError("Connection reset by peer")
+        self.downloaded.append(idx)
+
+
+def test_deferred_retries(tmp_path) -> None:
+    obj = Flaky(root=str(tmp_path), batch_size=2)
+    obj.downloaded, obj.prepped, obj.attempts = [], [], {}
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 6))
+    throughput = asyncio.run(obj.fetch(scrap_date, None, journal=False))
+    assert throughput.failed == [obj.urls[0]]
+    assert throughput.items == 5
+    assert obj.attempts[0] == obj.attempts[1] == 3
+    assert obj.downloaded[-1] == 1
+    assert sorted(obj.prepped) == list(range(1, 6))
+
+
+class FlakyScrap(Synthetic):
+    @handle_client_connection_error(default_cooldown=0, max_retries=2)
+    async def _scrap_(self, idx: int) -> None:
+        if idx == 0:
+            raise ClientConnectionError("Connection reset by peer")
+        await super()._scrap_(idx)
+
+
+def test_scrape_failures_not_counted(tmp_path) -> None:
+    obj = FlakyScrap(root=str(tmp_path), batch_size=2)
+    obj.downloaded, obj.prepped = [], []
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 6))
+    throughput = asyncio.run(obj.fetch(scrap_date, None, journal=False))
+    assert throughput.failed == ["20200101"]
+    assert throughput.items == len(obj.prepped) == 5
@@ -0,0 +1,36 @@
+from starstream._catalog import Catalog
+from starstream._utils import StarInterval, create_scrap_date
+from tests.conftest import prep
+from datetime import datetime, timedelta
+import polars as pl
+import os
+
+
+def test_parquet_storage(tmp_path) -> None:
+    obj = prep(str(tmp_path / "parquet"), 2, storage="parquet")
+    assert sorted(os.listdir(tmp_path / "parquet")) == [
+        "20200101.parquet",
+        "20200102.parquet",
+    ]
+    schema = pl.read_parquet_schema(obj.filepath("20200101"))
+    assert schema["date"] == pl.Datetime
+    assert all(schema[name] == pl.Float32 for name in obj.variables)
+    csv = prep(str(tmp_path / "csv"), 2)
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 2))
+    (df,) = obj.get_polars(scrap_date)
+    (expected,) = csv.get_polars(scrap_date)
+    assert df.height == expected.height == 1439
+    assert df["date"].to_list() == expected["date"].to_list()
+
+
+def test_mixed_storage(tmp_path) -> None:
+    root: str = str(tmp_path)
+    csv = prep(root, 2)
+    Catalog(root, "ACE.MAG").close()
+    scrap_date = (datetime(2020, 1, 1), datetime(2020, 1, 4))
+    csv._locate(StarInterval(create_scrap_date(scrap_date), csv.date_sampling))
+    parquet = prep(root, 2, storage="parquet", start=datetime(2020, 1, 3))
+    (df,) = parquet.get_polars(scrap_date, columns=["Bnorm"])
+    assert df.height == 3 * 1440 - 1 and df["date"].is_sorted()
+    (hourly,) = parquet.get_polars(scrap_date, timedelta(hours=1), ["Bnorm"])
+    assert hourly.height == 3 * 24 and hourly["Bnorm"].null_count() == 0